@@ -8,16 +8,25 @@
 
 import os
 import logging
+from typing import Dict, List
 from dataclasses import dataclass
 
-import re
 import json
+import functools
+from itertools import repeat
 
 from ctta.eventree import EventTree
-from ctta.flamegraph import BlockItem
+from ctta.eventstore import EventStore, ThreadStores
+from ctta.flamegraph import BlockItem, PruneOptions
 from ctta.flamegraph import render as render_flamegraph
-from ctta.callgrind import render as render_callgrind
+from ctta.callgrind import write_packed_stream, PHASES
 from ctta.callgrind import Entry
+from ctta.pool import map_items
+from ctta.matcher import PathMatcher
+from ctta.pathintern import PathInterner, get_interner
+from ctta.cache import CachedReader
+from ctta.tracereader import iter_events
+from ctta.jsonbackend import load_file, resolve_backend
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -25,30 +34,68 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _LOGGER = logging.getLogger(__name__)
 
 
-def analyze(files_list, exclude_list):
+def analyze(files_list, exclude_list, jobs=1, cache=None):
     exclude_filter = ExcludeItemFilter(exclude_list)
     _LOGGER.info("exclude list: %s", exclude_filter.raw_exclude)
 
+    ## merged dict is indexed by ids of paths
+    interner = get_interner()
     merged_dict = {}
-    for data_path in files_list:
-        events_list = read_events(data_path)
-        if not events_list:
+    reader = CachedReader(read_source_data, "source", cache)
+    for file_dict in map_items(reader, files_list, jobs):
+        if not file_dict:
             continue
+        merge_data(merged_dict, file_dict, exclude_filter, interner)
+
+    return sort_data(merged_dict, interner)
+
+
+## sort items by average duration
+## if 'interner' is given then keys of 'merged_dict' are ids of paths and are converted to paths
+def sort_data(merged_dict, interner: PathInterner = None):
+    # merged_dict = {k: v for k, v in sorted(merged_dict.items(), key=lambda item: item[1])}
+    sorted_list = sorted(merged_dict.items(), key=lambda item: item[1].avg())
+    if interner is not None:
+        return {interner.get_path(path_id): item_data for path_id, item_data in sorted_list}
+    return dict(sorted_list)
+
 
-        for event in events_list:
+## returns dict with summed 'Source' events of given file (before applying exclude filter)
+## events are summed by ids of paths, so each unique 'detail' is normalized only once
+def read_source_data(data_path):
+    interner = get_interner()
+    ids_dict = {}
+    try:
+        for event in iter_events(data_path):
             ev_name = event.get("name")
             if ev_name != "Source":
                 continue
-            event_data = get_data(event)
+            event_data = get_data_id(event, interner)
             if not event_data:
                 continue
-            if exclude_filter.excluded(event_data["file"]):
-                continue
-            add_data(merged_dict, event_data)
+            add_data(ids_dict, event_data)
+    except json.decoder.JSONDecodeError:
+        return {}
+    ## ids are not valid outside of current process
+    return {interner.get_path(path_id): item_data for path_id, item_data in ids_dict.items()}
 
-    # merged_dict = {k: v for k, v in sorted(merged_dict.items(), key=lambda item: item[1])}
-    merged_dict = dict(sorted(merged_dict.items(), key=lambda item: item[1].avg()))
-    return merged_dict
+
+## merge partial result of 'read_source_data' into 'merged_dict'
+## if 'interner' is given then 'merged_dict' is indexed by ids of paths
+def merge_data(merged_dict, file_dict, exclude_filter=None, interner: PathInterner = None):
+    for file, file_data in file_dict.items():
+        if interner is not None:
+            file = interner.intern(file)
+            if exclude_filter is not None and exclude_filter.excluded_id(file, interner):
+                continue
+        elif exclude_filter is not None and exclude_filter.excluded(file):
+            continue
+        item_data = merged_dict.get(file, None)
+        if item_data is None:
+            item_data = Data()
+            merged_dict[file] = item_data
+        item_data.dur += file_data.dur
+        item_data.count += file_data.count
 
 
 @dataclass
@@ -72,131 +119,290 @@ def add_data(merged_dict, event_data):
     merged_dict[file] = item_data
 
 
-def get_data(event):
+## returns duration and id of normalized path of 'Source' event
+def get_data_id(event, interner: PathInterner):
     args = event.get("args", {})
     if not args:
         return {}
     detail = args.get("detail", "")
-    detail = os.path.normpath(detail)
     dur = event.get("dur", 0)
-    return {"dur": dur, "file": detail}
+    return {"dur": dur, "file": interner.get_id(detail)}
 
 
 ##
 class ExcludeItemFilter:
     def __init__(self, exclude_set=None):
-        self.raw_exclude = set(exclude_set)
-        if self.raw_exclude is None:
-            self.raw_exclude = set()
+        self.raw_exclude = set(exclude_set or [])
         for item in self.raw_exclude.copy():
             if len(item) < 1:
                 self.raw_exclude.remove(item)
 
-        self.exclude_set = set()
-        self.regex_set = set()
-
-        for excl in self.raw_exclude:
-            if "*" in excl:
-                ## wildcard found
-                pattern = excl
-                pattern = pattern.replace("*", ".*")
-                regex_obj = re.compile(pattern)
-                self.regex_set.add(regex_obj)
-            else:
-                self.exclude_set.add(excl)
+        self.matcher = PathMatcher(self.raw_exclude)
+        ## decisions indexed by ids of paths
+        self._id_decisions: Dict[int, bool] = {}
 
     ## is item excluded?
     def excluded(self, item):
-        if item in self.exclude_set:
-            return True
-        for regex in self.regex_set:
-            if regex.match(item):
-                return True
-        return False
+        return self.matcher.match(item)
+
+    ## is path of given id excluded?
+    def excluded_id(self, path_id, interner: PathInterner):
+        decision = self._id_decisions.get(path_id)
+        if decision is None:
+            decision = self.matcher.match(interner.get_path(path_id))
+            self._id_decisions[path_id] = decision
+        return decision
 
 
 # =============================================================================
 
 
-def draw_flame_svg(file_path, out_svg_path):
-    blocks, bblocks = read_flame_blocks(file_path)
+## returns False if file does not contain events to draw (then image is not written)
+def draw_flame_svg(file_path, out_svg_path, cache=None, prune: PruneOptions = None):
+    reader = CachedReader(functools.partial(read_flame_blocks, prune=prune), get_flame_kind(prune), cache)
+    blocks, bblocks = reader(file_path)
     if not blocks and not bblocks:
-        return
+        return False
     render_flamegraph(blocks, bblocks, out_svg_path)
+    return True
 
 
-def read_flame_blocks(data_file_path):
-    events_list = read_events(data_file_path)
-    if not events_list:
-        _LOGGER.warning("unable to get trace events from file: %s", data_file_path)
-        return [], []
+## kind of cache entry depends on pruning options
+def get_flame_kind(prune: PruneOptions = None):
+    if prune is None or not prune.is_set():
+        return "flame"
+    return f"flame:{prune.min_dur}:{prune.min_width}:{prune.max_depth}:{int(prune.merge_small)}"
 
-    top_event_tree = EventTree()
-    bottom_event_tree = EventTree()
-    # trees_dict = {}
 
-    for event in events_list:
-        if event["ph"] != "X":
-            continue
+## events of each thread are nested separately (threads can overlap)
+## summary events are kept in single store (clang writes each "Total" event with its own tid)
+def read_flame_blocks(data_file_path, prune: PruneOptions = None):
+    top_event_tree = ThreadStores()
+    bottom_event_tree = EventStore()
 
-        # thread_id = event["tid"]
-        # thread_tree = trees_dict.get(thread_id)
-        # if thread_tree is None:
-        #     thread_tree = EventTree()
-        #     trees_dict[thread_id] = thread_tree
-        # thread_tree.add_event(event)
+    complete_events = read_complete_events(data_file_path)
+    if complete_events is None:
+        _LOGGER.warning("unable to get trace events from file: %s", data_file_path)
+        return [], []
 
-        ev_name = event.get("name")
-        if not ev_name.startswith("Total "):
+    for event in complete_events:
+        if not is_bottom_event(event):
             top_event_tree.add_event(event)
         else:
             bottom_event_tree.add_event(event)
 
-    # for key, val in trees_dict.items():
-    #     items = val.get_children()
-    #     print("xxxx:", key, len(items), items[0].event_data)
-    #
-    # all_entries = []
-    # for thread_tree in trees_dict.values():
-    #     entries = get_entries_from_tree(thread_tree, data_file_path)
-    #     all_entries.extend(entries)
+    return get_flame_blocks(top_event_tree, bottom_event_tree, prune)
+
+
+## events summarizing whole compilation (e.g. "Total Source") are drawn on bottom part of flame graph
+def is_bottom_event(event):
+    return event.get("name").startswith("Total ")
 
-    top_blocks = get_blocks_from_tree(top_event_tree, 0)
-    bottom_blocks = get_blocks_from_tree(bottom_event_tree, 1)
+
+## returns tuple (top blocks, bottom blocks)
+## if 'prune' is given then small and deep blocks are not created
+def get_flame_blocks(top_event_tree, bottom_event_tree, prune: PruneOptions = None):
+    min_dur = 0
+    max_depth = 0
+    merge_small = False
+    if prune is not None:
+        maxw = max(get_tree_max_width(top_event_tree), get_tree_max_width(bottom_event_tree))
+        min_dur = prune.get_min_dur(maxw)
+        max_depth = prune.max_depth
+        merge_small = prune.merge_small
+
+    top_blocks = get_blocks_from_tree(top_event_tree, 0, min_dur, max_depth, merge_small)
+    bottom_blocks = get_blocks_from_tree(bottom_event_tree, 1, min_dur, max_depth, merge_small)
 
     if not bottom_blocks:
         return bottom_blocks, top_blocks
     return top_blocks, bottom_blocks
 
 
-def get_blocks_from_tree(event_tree, color):
+## returns max end of events (the same as max width of blocks calculated while rendering)
+def get_tree_max_width(event_tree):
+    if isinstance(event_tree, ThreadStores):
+        return max((get_tree_max_width(event_store) for event_store in event_tree.get_stores()), default=0)
+    if isinstance(event_tree, EventStore):
+        if len(event_tree) < 1:
+            return 0
+        return max(start + duration for start, duration in zip(event_tree.ts, event_tree.dur))
+    ret_width = 0
+    for item, _ in event_tree.walk():
+        ret_width = max(ret_width, item.end())
+    return ret_width
+
+
+def get_blocks_from_tree(event_tree, color, min_dur=0, max_depth=0, merge_small=False):
+    return list(iter_blocks_from_tree(event_tree, color, min_dur, max_depth, merge_small))
+
+
+## yields blocks of tree items in pre-order
+## items shorter than 'min_dur' and items on level 'max_depth' or deeper are skipped with their subtrees
+## if 'merge_small' is set then adjacent skipped siblings are merged into "other" block
+def iter_blocks_from_tree(event_tree, color, min_dur=0, max_depth=0, merge_small=False):
+    if isinstance(event_tree, ThreadStores):
+        yield from iter_blocks_from_threads(event_tree, color, min_dur, max_depth, merge_small)
+        return
+    if isinstance(event_tree, EventStore):
+        yield from iter_blocks_from_store(event_tree, color, min_dur, max_depth, merge_small)
+        return
     if not event_tree:
-        return []
+        return
 
-    blocks_list = []
+    if min_dur > 0 or max_depth > 0:
+        items_list = []
+        starts = []
+        durs = []
+        levels = []
+        for item, level in event_tree.walk():
+            items_list.append(item)
+            starts.append(item.start())
+            durs.append(item.event_data["dur"])
+            levels.append(level)
+        for idx, x_pos, width, level, count in prune_preorder(starts, durs, levels, min_dur, max_depth, merge_small):
+            if idx is None:
+                yield get_other_block(x_pos, width, level, color, count)
+                continue
+            yield get_block_from_item(items_list[idx], level, color)
+        return
 
-    top_items = event_tree.get_children()
-    for item in top_items:
-        event = item.event_data
+    for item, level in event_tree.walk():
+        yield get_block_from_item(item, level, color)
 
-        block = BlockItem()
-        block.x = event["ts"]
-        block.w = event["dur"]
-        block.level = item.level
-        block.color = color
 
-        args = event.get("args", {})
-        event_name = args.get("detail")
-        if event_name is None:
-            event_name = event.get("name")
+def get_block_from_item(item, level, color):
+    event = item.event_data
 
-        block.name = os.path.basename(event_name)
-        block.full_name = event_name
-        block.hash_name = event_name
+    block = BlockItem()
+    block.x = event["ts"]
+    block.w = event["dur"]
+    block.level = level
+    block.color = color
 
-        blocks_list.append(block)
+    args = event.get("args", {})
+    event_name = args.get("detail")
+    if event_name is None:
+        event_name = event.get("name")
 
-    return blocks_list
+    block.name = os.path.basename(event_name)
+    block.full_name = event_name
+    block.hash_name = event_name
+    return block
+
+
+def get_other_block(x_pos, width, level, color, count):
+    return BlockItem(
+        x=x_pos,
+        w=width,
+        level=level,
+        color=color,
+        name="other",
+        full_name=f"other ({count} items)",
+        hash_name="other",
+    )
+
+
+## threads are drawn in lanes one below another, each lane starts with block of thread
+## events of single thread are drawn without block of thread
+def iter_blocks_from_threads(thread_stores: ThreadStores, color, min_dur=0, max_depth=0, merge_small=False):
+    stores_items = list(thread_stores.stores.items())
+    if len(stores_items) == 1:
+        yield from iter_blocks_from_store(stores_items[0][1], color, min_dur, max_depth, merge_small)
+        return
+
+    base_level = 0
+    for (pid, tid), event_store in stores_items:
+        blocks_list = list(iter_blocks_from_store(event_store, color, min_dur, max_depth, merge_small))
+        if not blocks_list:
+            continue
+        start = min(event_store.ts)
+        end = max(start + duration for start, duration in zip(event_store.ts, event_store.dur))
+        thread_name = f"thread {tid} (pid {pid})"
+        yield BlockItem(
+            x=start,
+            w=end - start,
+            level=base_level,
+            color=color,
+            name=thread_name,
+            full_name=thread_name,
+            hash_name=thread_name,
+        )
+        max_level = base_level
+        for block in blocks_list:
+            block.level += base_level + 1
+            max_level = max(max_level, block.level)
+            yield block
+        base_level = max_level + 1
+
+
+def iter_blocks_from_store(event_store: EventStore, color, min_dur=0, max_depth=0, merge_small=False):
+    event_store.nest()
+    names = event_store.names
+    base_names: Dict[int, str] = {}
+    label_ids = event_store.label_id
+    if min_dur > 0 or max_depth > 0:
+        items_iter = prune_preorder(event_store.ts, event_store.dur, event_store.level, min_dur, max_depth, merge_small)
+    else:
+        items_iter = zip(range(len(event_store)), event_store.ts, event_store.dur, event_store.level, repeat(1))
+    for idx, x_pos, width, level, count in items_iter:
+        if idx is None:
+            yield get_other_block(x_pos, width, level, color, count)
+            continue
+        label_id = label_ids[idx]
+        event_name = names[label_id]
+        base_name = base_names.get(label_id)
+        if base_name is None:
+            base_name = os.path.basename(event_name)
+            base_names[label_id] = base_name
+        yield BlockItem(
+            x=x_pos,
+            w=width,
+            level=level,
+            color=color,
+            name=base_name,
+            full_name=event_name,
+            hash_name=event_name,
+        )
+
+
+## prune items of tree given in pre-order
+## yields tuples (index, x, width, level, count) of remaining items
+## merged siblings are yielded with index None and number of merged items in 'count'
+def prune_preorder(starts, durs, levels, min_dur=0, max_depth=0, merge_small=False):
+    items_num = len(levels)
+    merged = None  # [level, start, end, count] of adjacent pruned siblings
+    idx = 0
+    while idx < items_num:
+        level = levels[idx]
+        start = starts[idx]
+        dur = durs[idx]
+        small = dur < min_dur
+        deep = 0 < max_depth <= level
+        if merged is not None and (level < merged[0] or not small):
+            if merged[2] - merged[1] >= min_dur:
+                yield None, merged[1], merged[2] - merged[1], merged[0], merged[3]
+            merged = None
+
+        if not small and not deep:
+            yield idx, start, dur, level, 1
+            idx += 1
+            continue
+
+        ## skip subtree
+        next_idx = idx + 1
+        while next_idx < items_num and levels[next_idx] > level:
+            next_idx += 1
+        if merge_small and not deep:
+            if merged is None:
+                merged = [level, start, start + dur, 1]
+            else:
+                merged[2] = max(merged[2], start + dur)
+                merged[3] += 1
+        idx = next_idx
+
+    if merged is not None and merged[2] - merged[1] >= min_dur:
+        yield None, merged[1], merged[2] - merged[1], merged[0], merged[3]
 
 
 # event fields:
@@ -208,108 +414,222 @@ def get_blocks_from_tree(event_tree, color):
 # 'dur' -- 'duration' (in microseconds)
 # 'name' -- label on item
 # 'args' -- dict with 'detail' and 'count' items
-def read_events(trace_file_path):
+def read_events(trace_file_path, backend=None):
+    backend = resolve_backend(backend)
+    if backend == "stream":
+        ## whole list is returned anyway
+        backend = "json"
     try:
-        with open(trace_file_path, encoding="utf-8") as data_file:
-            dict_data = json.load(data_file)
-            if not isinstance(dict_data, dict):
-                return None
-            events_list = dict_data.get("traceEvents")
-            if not events_list:
-                return None
-            return events_list
+        dict_data = load_file(trace_file_path, backend)
+        if not isinstance(dict_data, dict):
+            return None
+        events_list = dict_data.get("traceEvents")
+        if not events_list:
+            return None
+        return events_list
+
+    except json.decoder.JSONDecodeError:
+        return None
+
 
+## returns generator of complete ('ph' == 'X') events
+## returns None if file does not contain any event
+def read_complete_events(trace_file_path):
+    events_iter = iter_events(trace_file_path)
+    try:
+        first_event = next(events_iter, None)
     except json.decoder.JSONDecodeError:
         return None
+    if first_event is None:
+        return None
+    return _filter_complete_events(first_event, events_iter)
+
+
+def _filter_complete_events(first_event, events_iter):
+    if first_event["ph"] == "X":
+        yield first_event
+    try:
+        for event in events_iter:
+            if event["ph"] == "X":
+                yield event
+    except json.decoder.JSONDecodeError as exc:
+        _LOGGER.warning("malformed trace events: %s", exc)
 
 
 # =============================================================================
 
 
-def run_callgrind_view(files_list, out_callgrind_path):
-    data_entries = []
+## entries of each file are written to output just after receiving them from worker
+## if 'merge' is set, then entries of equal names of all files are merged into single function
+def run_callgrind_view(files_list, out_callgrind_path, jobs=1, cache=None, merge=False):
+    reader = CachedReader(read_callgrind_packed, "callgrind", cache)
+    packed_list = map_items(reader, files_list, jobs)
+    write_packed_stream(iter_logged(packed_list, files_list), out_callgrind_path, merge=merge)
+
+
+def iter_logged(packed_list, files_list):
     files_len = len(files_list)
-    for idx, data_file in enumerate(files_list):
-        _LOGGER.info("%s/%s: drawing callgrind view for %s", idx, files_len, data_file)
-        entries = read_callgrind_enries(data_file)
-        data_entries.extend(entries)
-    render_callgrind(data_entries, out_callgrind_path)
+    for idx, packed_entries in enumerate(packed_list):
+        _LOGGER.info("%s/%s: drawing callgrind view for %s", idx, files_len, files_list[idx])
+        yield packed_entries
+
+
+## read entries in flat form (without nested references)
+## it is cheaper to transfer between processes and does not hit recursion limit of pickle
+def read_callgrind_packed(data_file_path):
+    top_store = read_callgrind_store(data_file_path)
+    if top_store is None:
+        return [], b""
+    return pack_store_entries(top_store, data_file_path)
+
+
+## returns tuple (packed entries, phase of each entry)
+## entries of threads are placed one after another
+def pack_store_entries(event_store, data_file_path):
+    stores_list = [event_store]
+    if isinstance(event_store, ThreadStores):
+        stores_list = event_store.get_stores()
+    entries = []
+    phases = []
+    for thread_store in stores_list:
+        entries.extend(get_entries_from_store(thread_store, data_file_path))
+        phases.append(get_events_phases(thread_store))
+    return pack_entries(entries), b"".join(phases)
+
+
+## returns phase of each event as bytes (index in 'PHASES' increased by 1, 0 means event outside of phases)
+## phase of event is the nearest enclosing phase event (or event itself)
+def get_events_phases(event_store: EventStore):
+    event_store.nest()
+    phases_dict = {event_store.intern(phase): phase_idx for phase_idx, phase in enumerate(PHASES, 1)}
+    phases = bytearray(len(event_store))
+    name_id = event_store.name_id
+    for idx, parent in enumerate(event_store.parent):
+        phase = phases_dict.get(name_id[idx])
+        if phase is None:
+            phase = phases[parent] if parent >= 0 else 0
+        phases[idx] = phase
+    return bytes(phases)
+
+
+def pack_entries(entries_list):
+    index_dict = {id(entry): idx for idx, entry in enumerate(entries_list)}
+    packed_list = []
+    for entry in entries_list:
+        calls = [index_dict[id(child)] for child in entry.calls]
+        packed_list.append((entry.code, entry.callcount, entry.reccallcount, entry.inlinetime, entry.totaltime, calls))
+    return packed_list
+
+
+def unpack_entries(packed_list):
+    entries_list = [
+        Entry(code, callcount, reccall, inline, total, []) for code, callcount, reccall, inline, total, _ in packed_list
+    ]
+    for entry, packed in zip(entries_list, packed_list):
+        entry.calls.extend(entries_list[idx] for idx in packed[5])
+    return entries_list
 
 
 def read_callgrind_enries(data_file_path):
-    events_list = read_events(data_file_path)
-    if not events_list:
-        _LOGGER.warning("unable to get trace events from file: %s", data_file_path)
+    top_event_tree = read_callgrind_store(data_file_path)
+    if top_event_tree is None:
         return []
+    entries = get_entries_from_tree(top_event_tree, data_file_path)
+    return entries
+
 
-    top_event_tree = EventTree()
+def read_callgrind_store(data_file_path):
+    top_event_tree = ThreadStores()
     # bottom_event_tree = EventTree()
 
-    for event in events_list:
-        if event["ph"] != "X":
-            continue
+    complete_events = read_complete_events(data_file_path)
+    if complete_events is None:
+        _LOGGER.warning("unable to get trace events from file: %s", data_file_path)
+        return None
 
-        ev_name = event.get("name")
-        if not ev_name.startswith("Total "):
+    ## events are added directly (without intermediate list), so streaming reader keeps memory low
+    for event in complete_events:
+        if not is_bottom_event(event):
             top_event_tree.add_event(event)
         # else:
         #     bottom_event_tree.add_event(event)
-
-    entries = get_entries_from_tree(top_event_tree, data_file_path)
-    return entries
+    return top_event_tree
 
 
 def get_entries_from_tree(event_tree, data_file_path):
+    if isinstance(event_tree, ThreadStores):
+        entries_list = []
+        for event_store in event_tree.get_stores():
+            entries_list.extend(get_entries_from_store(event_store, data_file_path))
+        return entries_list
+    if isinstance(event_tree, EventStore):
+        return get_entries_from_store(event_tree, data_file_path)
     if not event_tree:
         return []
+    return get_entries_from_event_tree(event_tree, data_file_path)
 
-    entries_list = []
-    entries_dict = {}
-
-    top_items = event_tree.get_children()
-    for item in top_items:
-        entry = entries_dict.get(item)
-        if entry is None:
-            entry = get_entry_from_item(item, data_file_path)
-            entries_dict[item] = entry
-            entries_list.append(entry)
-
-        for child_item in item.children:
-            child_entry = entries_dict.get(child_item)
-            if child_entry is None:
-                child_entry = get_entry_from_item(child_item, data_file_path)
-                entries_dict[child_item] = child_entry
-                entries_list.append(child_entry)
-            entry.calls.append(child_entry)
 
+## converts tree to entries in single traversal, entries are placed in pre-order (the same as for 'EventStore')
+## durations of children are summed while visiting children, self time of entry is set in post-order
+## (when its subtree is finished)
+def get_entries_from_event_tree(event_tree: EventTree, data_file_path):
+    entries_list = []
+    children_durs: List[float] = []  # sum of durations of children of each entry
+    codes: Dict[str, str] = {}
+    ## stack of pairs (item, index of parent entry), item None marks end of subtree of entry
+    items_stack = [(item, -1) for item in reversed(event_tree.get_top_items())]
+    while items_stack:
+        item, index = items_stack.pop()
+        if item is None:
+            entry = entries_list[index]
+            entry.inlinetime = entry.totaltime - children_durs[index] / 1000000  # convert to seconds
+            continue
+        parent = index
+        event = item.event_data
+        event_name = event.get("args", {}).get("detail")
+        if event_name is None:
+            event_name = event.get("name")
+        code = codes.get(event_name)
+        if code is None:
+            code = get_entry_name(event_name, data_file_path)
+            codes[event_name] = code
+        duration = float(event["dur"]) / 1000000  # convert to seconds
+        index = len(entries_list)
+        entry = Entry(code, 1, 1, duration, duration, [])
+        entries_list.append(entry)
+        children_durs.append(0.0)
+        if parent >= 0:
+            entries_list[parent].calls.append(entry)
+            children_durs[parent] += float(event["dur"])
+        if item.children:
+            items_stack.append((None, index))
+            items_stack.extend((child, index) for child in reversed(item.children))
     return entries_list
 
 
-def get_entry_from_item(item, data_file_path):
-    event = item.event_data
+def get_entries_from_store(event_store: EventStore, data_file_path):
+    children_dur = event_store.get_children_durations()
+    names = event_store.names
+    codes: Dict[int, str] = {}
+    entries_list = []
+    for idx, label_id in enumerate(event_store.label_id):
+        code = codes.get(label_id)
+        if code is None:
+            code = get_entry_name(names[label_id], data_file_path)
+            codes[label_id] = code
+        duration = float(event_store.dur[idx]) / 1000000  # convert to seconds
+        self_dur = duration - children_dur[idx] / 1000000
+        entry = Entry(code, 1, 1, self_dur, duration, [])
+        entries_list.append(entry)
+        parent = event_store.parent[idx]
+        if parent >= 0:
+            entries_list[parent].calls.append(entry)
+    return entries_list
 
-    args = event.get("args", {})
-    event_name = args.get("detail")
-    if event_name is None:
-        event_name = event.get("name")
 
+def get_entry_name(event_name, data_file_path):
     if event_name == "ExecuteCompiler":
-        event_name = data_file_path
-    elif event_name in ["Frontend", "Backend", "CodeGenPasses", "PerformPendingInstantiations", "PerModulePasses"]:
-        event_name = f"{data_file_path}:{event_name}"
-
-    # short_name = os.path.basename(event_name)
-    # code = Code(event_name, 0, short_name)
-    code = event_name
-
-    children_dur = 0
-    for child in item.children:
-        child_event = child.event_data
-        children_dur += float(child_event["dur"])
-
-    duration = float(event["dur"]) / 1000000  # convert to seconds
-    children_dur = float(children_dur) / 1000000  # convert to seconds
-    self_dur = duration - children_dur
-    entry = Entry(code, 1, 1, self_dur, duration, [])
-
-    return entry
+        return data_file_path
+    if event_name in ["Frontend", "Backend", "CodeGenPasses", "PerformPendingInstantiations", "PerModulePasses"]:
+        return f"{data_file_path}:{event_name}"
+    return event_name
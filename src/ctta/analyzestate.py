@@ -0,0 +1,133 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import json
+from typing import Dict, Any
+
+from ctta import __version__
+from ctta.analyzer import Data, ExcludeItemFilter, read_source_data, merge_data, sort_data
+from ctta.pool import map_items
+from ctta.cache import CachedReader
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+STATE_FORMAT_VERSION = 1
+
+
+## state of 'analyze' -- contribution of each input file to each header and total values
+##
+## state file is JSON of following structure:
+##    {
+##        "version": <format version>,
+##        "tool": <version of ctta>,
+##        "files": {<trace path>: {"mtime": <ns>, "size": <bytes>, "data": {<header>: [<dur>, <count>]}}},
+##        "totals": {<header>: [<dur>, <count>]}
+##    }
+## all values are stored before applying exclude filter
+class AnalyzeState:
+    def __init__(self):
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.totals: Dict[str, Data] = {}
+
+    def load(self, state_path):
+        with open(state_path, encoding="utf-8") as state_file:
+            state_data = json.load(state_file)
+        if state_data.get("version") != STATE_FORMAT_VERSION or state_data.get("tool") != __version__:
+            _LOGGER.warning("incompatible state file %s - state will be recalculated", state_path)
+            return False
+        self.files = state_data.get("files", {})
+        self.totals = {header: Data(dur, count) for header, (dur, count) in state_data.get("totals", {}).items()}
+        return True
+
+    def save(self, state_path):
+        state_data = {
+            "version": STATE_FORMAT_VERSION,
+            "tool": __version__,
+            "files": self.files,
+            "totals": {header: [data.dur, data.count] for header, data in self.totals.items()},
+        }
+        with open(state_path, "w", encoding="utf-8") as state_file:
+            json.dump(state_data, state_file, separators=(",", ":"))
+
+    ## returns tuple of lists (changed or new files with their stats, removed files)
+    def find_changes(self, files_list):
+        changed_list = []
+        current_set = set()
+        for data_path in files_list:
+            abs_path = os.path.abspath(data_path)
+            current_set.add(abs_path)
+            file_stat = os.stat(data_path)
+            file_state = self.files.get(abs_path)
+            if file_state is None:
+                changed_list.append((data_path, file_stat))
+                continue
+            if file_state["mtime"] != file_stat.st_mtime_ns or file_state["size"] != file_stat.st_size:
+                changed_list.append((data_path, file_stat))
+        removed_list = [abs_path for abs_path in self.files if abs_path not in current_set]
+        return changed_list, removed_list
+
+    def remove_file(self, abs_path):
+        file_state = self.files.pop(abs_path, None)
+        if file_state is None:
+            return
+        for header, (dur, count) in file_state["data"].items():
+            total_data = self.totals.get(header)
+            if total_data is None:
+                continue
+            total_data.dur -= dur
+            total_data.count -= count
+            if total_data.count <= 0:
+                del self.totals[header]
+
+    ## 'file_stat' is taken before reading the file
+    def add_file(self, data_path, file_stat, file_dict: Dict[str, Data]):
+        abs_path = os.path.abspath(data_path)
+        self.remove_file(abs_path)
+        self.files[abs_path] = {
+            "mtime": file_stat.st_mtime_ns,
+            "size": file_stat.st_size,
+            "data": {header: [data.dur, data.count] for header, data in file_dict.items()},
+        }
+        merge_data(self.totals, file_dict)
+
+
+## analyze files and store state in 'state_path'
+## if 'update' is set then previous state is updated with changed files only, so cost
+## of update depends on number of changed files, not on number of all files
+def analyze_update(files_list, exclude_list, state_path, update=True, jobs=1, cache=None):
+    exclude_filter = ExcludeItemFilter(exclude_list)
+    _LOGGER.info("exclude list: %s", exclude_filter.raw_exclude)
+
+    state = AnalyzeState()
+    if update and os.path.isfile(state_path):
+        if not state.load(state_path):
+            state = AnalyzeState()
+
+    changed_list, removed_list = state.find_changes(files_list)
+    _LOGGER.info("changed files: %s removed files: %s", len(changed_list), len(removed_list))
+
+    for abs_path in removed_list:
+        state.remove_file(abs_path)
+
+    ## stats are taken before reading, so files modified in meantime will be read again in next update
+    changed_paths = [data_path for data_path, _ in changed_list]
+    reader = CachedReader(read_source_data, "source", cache)
+    for (data_path, file_stat), file_dict in zip(changed_list, map_items(reader, changed_paths, jobs)):
+        state.add_file(data_path, file_stat, file_dict)
+
+    state.save(state_path)
+
+    merged_dict: Dict[str, Data] = {}
+    merge_data(merged_dict, state.totals, exclude_filter)
+    return sort_data(merged_dict)
@@ -0,0 +1,150 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import hashlib
+import pickle
+import zlib
+import tempfile
+
+from ctta import __version__
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## increase when format of cached results changes
+CACHE_FORMAT_VERSION = 4
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024  # in bytes
+
+
+## on-disk cache of results calculated for trace files
+##
+## results are keyed by kind of result, path, modification time and size of trace file
+## and version of the tool, so entries of changed files are never served. Path is taken
+## both as given and absolute, because results can contain the given path (e.g. names
+## of callgrind functions). Each result
+## is stored in separate file as compressed pickle. Cache is evicted in LRU order
+## (by modification time of cache file that is updated on each hit).
+class ResultCache:
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_path(self, kind, file_path):
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        abs_path = os.path.abspath(file_path)
+        key_data = (
+            f"{__version__}|{CACHE_FORMAT_VERSION}|{kind}|{file_path}|{abs_path}"
+            f"|{file_stat.st_mtime_ns}|{file_stat.st_size}"
+        )
+        key = hashlib.sha1(key_data.encode("utf-8"), usedforsecurity=False).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pickle")
+
+    ## returns tuple (found, value)
+    def load(self, kind, file_path):
+        cache_path = self.get_path(kind, file_path)
+        return self.load_entry(cache_path)
+
+    def store(self, kind, file_path, value):
+        cache_path = self.get_path(kind, file_path)
+        self.store_entry(cache_path, value)
+
+    ## returns tuple (found, value)
+    def load_entry(self, cache_path):
+        if cache_path is None:
+            return False, None
+        try:
+            with open(cache_path, "rb") as cache_file:
+                data = cache_file.read()
+            value = pickle.loads(zlib.decompress(data))
+        except FileNotFoundError:
+            return False, None
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError) as exc:
+            _LOGGER.warning("unable to load cache entry %s: %s", cache_path, exc)
+            return False, None
+        try:
+            ## mark as recently used
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return True, value
+
+    def store_entry(self, cache_path, value):
+        if cache_path is None:
+            return
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        cache_subdir = os.path.dirname(cache_path)
+        os.makedirs(cache_subdir, exist_ok=True)
+        ## write to temporary file and rename -- other processes never see partial file
+        temp_fd, temp_path = tempfile.mkstemp(dir=cache_subdir, suffix=".tmp")
+        try:
+            with os.fdopen(temp_fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    ## remove least recently used entries until size of cache fits in limit
+    def evict(self):
+        entries_list = []
+        total_size = 0
+        for cache_subdir in os.scandir(self.cache_dir):
+            if not cache_subdir.is_dir():
+                continue
+            for entry in os.scandir(cache_subdir.path):
+                if not entry.name.endswith(".pickle"):
+                    continue
+                entry_stat = entry.stat()
+                entries_list.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+                total_size += entry_stat.st_size
+        if total_size <= self.max_size:
+            return
+        entries_list.sort()
+        removed = 0
+        for _, entry_size, entry_path in entries_list:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_size -= entry_size
+            removed += 1
+        _LOGGER.info("removed %s entries from cache %s", removed, self.cache_dir)
+
+
+## calls 'func(file_path)' or returns its cached result
+## object is picklable, so it can be passed to worker processes
+class CachedReader:
+    def __init__(self, func, kind, cache: ResultCache = None):
+        self.func = func
+        self.kind = kind
+        self.cache = cache
+
+    def __call__(self, file_path):
+        if self.cache is None:
+            return self.func(file_path)
+        ## key is calculated before reading, so result of file modified in meantime will not be served later
+        cache_path = self.cache.get_path(self.kind, file_path)
+        found, value = self.cache.load_entry(cache_path)
+        if found:
+            return value
+        value = self.func(file_path)
+        self.cache.store_entry(cache_path, value)
+        return value
@@ -8,7 +8,11 @@
 
 import os
 import logging
-from typing import List
+import gzip
+import tempfile
+import subprocess
+from array import array
+from typing import Dict, List
 
 import pyprof2calltree
 
@@ -42,3 +46,204 @@ def render(data_entries: List[Entry], out_callgrind_path=None):
     with open(out_callgrind_path, "w", encoding="utf-8") as out_file:
         converter.output(out_file)
         converter.visualize()
+
+
+## conversion from seconds (unit of 'Entry' times) to nanoseconds (unit of callgrind costs)
+SCALE = 1e9
+
+## phases of compilation with separate cost event
+PHASES = ["Frontend", "Backend", "PerformPendingInstantiations"]
+
+## cost events of each function: time, number of instances and time spent in each phase
+## time of function is attributed to the nearest enclosing phase
+EVENTS = [("ns", "Time [ns]"), ("count", "Instances")] + [(phase, f"{phase} time [ns]") for phase in PHASES]
+
+EVENTS_NUM = len(EVENTS)
+
+
+## writes callgrind file directly (without building whole 'pyprof2calltree.CalltreeConverter')
+## functions are written in order of adding, so memory does not depend on number of traces
+## repeated names are compressed to "(id)" form
+class CallgrindWriter:
+    def __init__(self, out_file):
+        self.out_file = out_file
+        self.names_dict: Dict[str, int] = {}
+        self.total = array("q", bytes(8 * EVENTS_NUM))
+
+    def write_header(self):
+        self.out_file.write("# callgrind format\n")
+        self.out_file.write("version: 1\n")
+        self.out_file.write("creator: ctta\n")
+        for event_name, event_desc in EVENTS:
+            self.out_file.write(f"event: {event_name} : {event_desc}\n")
+        self.out_file.write(f"events: {' '.join(event_name for event_name, _ in EVENTS)}\n")
+        ## entries have no source files -- all functions are placed in common file, called functions inherit it
+        self.out_file.write("fl=~\n")
+
+    def write_footer(self):
+        self.out_file.write(f"totals: {format_costs(self.total)}\n")
+
+    ## write entries in form returned by 'ctta.analyzer.pack_store_entries'
+    def write_packed(self, packed):
+        entries_list = packed[0]
+        self_costs, total_costs = get_packed_costs(packed)
+        for idx in range(EVENTS_NUM):
+            self.total[idx] += sum(self_costs[idx::EVENTS_NUM])
+        get_name = self.get_name
+        lines = []
+        for idx, entry in enumerate(entries_list):
+            lines.append(f"fn={get_name(entry[0])}\n0 {format_costs(self_costs, idx)}\n")
+            for child in entry[5]:
+                child_entry = entries_list[child]
+                lines.append(
+                    f"cfn={get_name(child_entry[0])}\ncalls={child_entry[1]} 0\n0 {format_costs(total_costs, child)}\n"
+                )
+            lines.append("\n")
+        self.out_file.write("".join(lines))
+
+    ## 'self_costs' -- sequence of costs of each event given in nanoseconds (number of instances for 'count')
+    ## 'calls' -- iterable of tuples (function name, calls count, sequence of inclusive costs)
+    def write_costs(self, name, self_costs, calls):
+        for idx, cost in enumerate(self_costs):
+            self.total[idx] += cost
+        out_file = self.out_file
+        out_file.write(f"fn={self.get_name(name)}\n0 {format_costs(self_costs)}\n")
+        for child_name, callcount, total_costs in calls:
+            out_file.write(f"cfn={self.get_name(child_name)}\ncalls={callcount} 0\n0 {format_costs(total_costs)}\n")
+        out_file.write("\n")
+
+    ## first occurrence of name is written with id, next occurrences are written with id only
+    def get_name(self, name):
+        name_id = self.names_dict.get(name)
+        if name_id is not None:
+            return f"({name_id})"
+        name_id = len(self.names_dict) + 1
+        self.names_dict[name] = name_id
+        return f"({name_id}) {name}"
+
+
+def to_cost(time_sec):
+    return int(round(time_sec * SCALE))
+
+
+## format costs of item of given index, trailing zero costs are omitted
+def format_costs(costs, index=0):
+    start = index * EVENTS_NUM
+    end = start + EVENTS_NUM
+    while end > start + 1 and costs[end - 1] == 0:
+        end -= 1
+    return " ".join(map(str, costs[start:end]))
+
+
+## returns tuple (self costs, inclusive costs) of packed entries
+## costs of all entries are kept in flat arrays ('EVENTS_NUM' items per entry)
+## children have to be placed after parents (as in pre-order)
+def get_packed_costs(packed):
+    entries_list, phases = packed
+    self_costs = array("q", bytes(8 * EVENTS_NUM * len(entries_list)))
+    for idx, entry in enumerate(entries_list):
+        start = idx * EVENTS_NUM
+        cost = to_cost(entry[3])
+        self_costs[start] = cost
+        self_costs[start + 1] = entry[1]
+        phase = phases[idx]
+        if phase:
+            self_costs[start + 1 + phase] = cost
+
+    total_costs = array("q", self_costs)
+    for idx in range(len(entries_list) - 1, -1, -1):
+        start = idx * EVENTS_NUM
+        for child in entries_list[idx][5]:
+            add_costs(total_costs, start, total_costs, child * EVENTS_NUM)
+    return self_costs, total_costs
+
+
+## entries of many traces merged by function name
+## size depends on number of unique names instead of number of events
+class MergedEntries:
+    def __init__(self):
+        ## function name -> self costs
+        self.functions: Dict[str, array] = {}
+        ## caller name -> callee name -> [calls count, inclusive costs...]
+        self.calls: Dict[str, Dict[str, array]] = {}
+
+    ## add entries in form returned by 'ctta.analyzer.pack_store_entries'
+    def add_packed(self, packed):
+        entries_list = packed[0]
+        self_costs, total_costs = get_packed_costs(packed)
+        for idx, entry in enumerate(entries_list):
+            code = entry[0]
+            func_costs = self.functions.get(code)
+            if func_costs is None:
+                func_costs = array("q", bytes(8 * EVENTS_NUM))
+                self.functions[code] = func_costs
+            add_costs(func_costs, 0, self_costs, idx * EVENTS_NUM)
+            if not entry[5]:
+                continue
+            callees_dict = self.calls.get(code)
+            if callees_dict is None:
+                callees_dict = {}
+                self.calls[code] = callees_dict
+            for child in entry[5]:
+                child_entry = entries_list[child]
+                call_data = callees_dict.get(child_entry[0])
+                if call_data is None:
+                    call_data = array("q", bytes(8 * (EVENTS_NUM + 1)))
+                    callees_dict[child_entry[0]] = call_data
+                call_data[0] += child_entry[1]
+                add_costs(call_data, 1, total_costs, child * EVENTS_NUM)
+
+    def write(self, writer: CallgrindWriter):
+        for name, func_costs in self.functions.items():
+            callees_dict = self.calls.get(name, {})
+            calls = ((callee, call_data[0], call_data[1:]) for callee, call_data in callees_dict.items())
+            writer.write_costs(name, func_costs, calls)
+
+
+def add_costs(target, target_start, source, source_start):
+    for offset in range(EVENTS_NUM):
+        target[target_start + offset] += source[source_start + offset]
+
+
+## open file for writing callgrind data, output is compressed if path ends with ".gz"
+def open_callgrind_file(out_callgrind_path):
+    if out_callgrind_path.endswith(".gz"):
+        return gzip.open(out_callgrind_path, "wt", encoding="utf-8")
+    return open(out_callgrind_path, "w", encoding="utf-8")
+
+
+## open callgrind file in kcachegrind viewer
+def view_file(callgrind_path):
+    for cmd in pyprof2calltree.KCACHEGRIND_EXECUTABLES:
+        if pyprof2calltree.is_installed(cmd):
+            subprocess.call([cmd, callgrind_path])
+            return
+    _LOGGER.warning("could not find kcachegrind, tried: %s", ", ".join(pyprof2calltree.KCACHEGRIND_EXECUTABLES))
+
+
+## write callgrind file from iterable of packed entries lists (each list is written and released before next one)
+## if 'merge' is set, then entries of equal names are written as single function
+## if 'out_callgrind_path' is not given, then temporary file is written and removed after closing viewer
+def write_packed_stream(packed_iter, out_callgrind_path=None, view=True, merge=False):
+    use_temp_file = not out_callgrind_path
+    if use_temp_file:
+        fd, out_callgrind_path = tempfile.mkstemp(".callgrind", "ctta")
+        os.close(fd)
+    try:
+        with open_callgrind_file(out_callgrind_path) as out_file:
+            writer = CallgrindWriter(out_file)
+            writer.write_header()
+            if merge:
+                merged = MergedEntries()
+                for packed_list in packed_iter:
+                    merged.add_packed(packed_list)
+                merged.write(writer)
+            else:
+                for packed_list in packed_iter:
+                    writer.write_packed(packed_list)
+            writer.write_footer()
+        if view:
+            view_file(out_callgrind_path)
+    finally:
+        if use_temp_file:
+            os.remove(out_callgrind_path)
@@ -0,0 +1,66 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import gzip
+from typing import List
+
+from ctta.flamemerge import StackTree, merge_flame_stacks
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## export call stacks of given files in collapsed format (one line per stack: "a;b;c <self time in us>")
+## stacks of all files are merged, so each unique stack is written once
+## output is compressed if path ends with ".gz"
+def export_collapsed(files_list, out_path, jobs=1, cache=None):
+    stacks = merge_flame_stacks(files_list, jobs=jobs, cache=cache)
+    ## bottom part of flame graph contains summary events -- would duplicate time of top part
+    lines_num = write_collapsed_file(stacks.top, out_path)
+    _LOGGER.info("written %s stacks to %s", lines_num, out_path)
+
+
+def write_collapsed_file(stack_tree: StackTree, out_path):
+    if out_path.endswith(".gz"):
+        with gzip.open(out_path, "wt", encoding="utf-8") as out_file:
+            return write_collapsed(stack_tree, out_file)
+    with open(out_path, "w", encoding="utf-8") as out_file:
+        return write_collapsed(stack_tree, out_file)
+
+
+## lines are written while traversing tree, stacks with zero self time are omitted
+## returns number of written lines
+def write_collapsed(stack_tree: StackTree, out_file):
+    children_dur = get_children_durations(stack_tree)
+    frames: List[str] = []
+    lines_num = 0
+    for node, level in stack_tree.walk():
+        del frames[level:]
+        frames.append(get_frame_name(stack_tree.keys[node][1]))
+        self_dur = round(stack_tree.dur[node] - children_dur[node])
+        if self_dur <= 0:
+            continue
+        out_file.write(f"{';'.join(frames)} {self_dur}\n")
+        lines_num += 1
+    return lines_num
+
+
+def get_children_durations(stack_tree: StackTree):
+    children_dur = [0.0] * len(stack_tree.keys)
+    for node in range(1, len(stack_tree.keys)):
+        children_dur[stack_tree.parent[node]] += stack_tree.dur[node]
+    return children_dur
+
+
+## frames are separated by semicolon and value is separated by last space
+def get_frame_name(label):
+    return label.replace(";", ":").replace("\n", " ")
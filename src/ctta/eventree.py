@@ -8,121 +8,172 @@
 
 import os
 import logging
-from typing import Dict, List, Any
+import itertools
+from bisect import bisect_left, bisect_right
+from array import array
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 _LOGGER = logging.getLogger(__name__)
 
+## sequence number of created tree items
+_ITEMS_COUNTER = itertools.count()
 
+
+## children of container are disjoint intervals sorted by start
+## (and so by end), so they can be searched using bisection
+##
+## level of item is not stored -- it is calculated from chain of parents,
+## so moving subtree to other parent does not require to update levels
 class TreeItemContainer:
     def __init__(self):
         self.children: List[TreeItem] = []
-        self.level = -1
-
+        self.parent: Optional[TreeItemContainer] = None
+        self._base_level = -1  # level of container if it does not have parent
+        self._starts: List[Any] = []  # start of each child
+        self._ends: List[Any] = []  # end of each child
+
+    @property
+    def level(self):
+        depth = 0
+        container = self
+        while container.parent is not None:
+            depth += 1
+            container = container.parent
+        return container._base_level + depth
+
+    ## returns all descendants -- direct children first, then descendants of each child
     def get_children(self):
         ret_list = []
-        ret_list.extend(self.children)
-        for item in self.children:
-            ret_list.extend(item.get_children())
+        containers_stack = [self]
+        while containers_stack:
+            container = containers_stack.pop()
+            ret_list.extend(container.children)
+            containers_stack.extend(reversed(container.children))
         return ret_list
 
+    ## iterate descendants in pre-order (parent before its children)
+    def iter_children(self) -> Iterator["TreeItem"]:
+        for item, _ in self.walk():
+            yield item
+
+    ## iterate pairs (item, level) of descendants in pre-order
+    def walk(self) -> Iterator[Tuple["TreeItem", int]]:
+        child_level = self.level + 1
+        items_stack = [(item, child_level) for item in reversed(self.children)]
+        while items_stack:
+            item, level = items_stack.pop()
+            yield item, level
+            child_level = level + 1
+            items_stack.extend((child, child_level) for child in reversed(item.children))
+
+    ## set level of root container (levels of items are calculated from parents)
     def set_level(self, new_level):
-        self.level = new_level
-        for item in self.children:
-            item.set_level(new_level + 1)
+        if self.parent is not None:
+            raise RuntimeError("unable to set level of nested item")
+        self._base_level = new_level
 
+    ## item is nested with the same rule as in 'nest_intervals' -- identical intervals
+    ## are nested by order of creation of items (later item is parent)
     def add_item(self, item):
-        if not self.children:
-            self._append(item)
-            return
-        self._add_cover(item)
-        self._add_side(item)
-
-    def _add_cover(self, item):
-        if not self.children:
-            return
-
-        # check cover
-        item_start = item.start()
-        item_end = item.end()
-
-        if item_end < self.children[0].start():
-            # before first
-            return
-        if item_start > self.children[-1].end():
-            # after last
-            return
-
-        idx = 0
-        while idx < len(self.children):
-            child = self.children[idx]
-            if item_start <= child.start():
-                if item_end >= child.end():
-                    # fully covers
-                    del self.children[idx]
-                    item.add_item(child)
-                else:
-                    if item_end < child.start():
-                        break
-                    idx += 1
-            else:
-                idx += 1
-
-    def _add_side(self, item):
-        if not self.children:
-            self._append(item)
-            return
-
-        # add item
+        container = self
+        while True:
+            ## returns child that should contain the item
+            child = container._find_parent(item)  # pylint: disable=W0212
+            if child is None:
+                break
+            container = child
+        container._insert_item(item)  # pylint: disable=W0212
+
+    def _find_parent(self, item):
+        ## children have increasing starts, so only last child starting before item can contain it
+        idx = bisect_right(self._starts, item.start()) - 1
+        if idx < 0:
+            return None
+        child = self.children[idx]
+        if child.end() < item.end():
+            return None
+        if child.start() == item.start() and child.end() == item.end() and child.seq < item.seq:
+            ## identical interval created earlier is child
+            return None
+        return child
+
+    def _insert_item(self, item):
         item_start = item.start()
         item_end = item.end()
 
-        if item_end < self.children[0].start():
-            # before first
-            self._insert(0, item)
+        ## covered children form continuous range
+        first_idx = bisect_left(self._starts, item_start)
+        last_idx = max(bisect_right(self._ends, item_end), first_idx)
+        if first_idx > 0 and self._ends[first_idx - 1] > item_start:
+            # partially after previous child
+            raise RuntimeError("invalid case")
+        if last_idx < len(self.children) and self._starts[last_idx] < item_end:
+            # partially before next child
+            raise RuntimeError("invalid case")
+
+        if first_idx < last_idx:
+            covered_list = self.children[first_idx:last_idx]
+            del self.children[first_idx:last_idx]
+            del self._starts[first_idx:last_idx]
+            del self._ends[first_idx:last_idx]
+            item._add_covered(covered_list)  # pylint: disable=W0212
+        self._insert(first_idx, item)
+
+        if first_idx > 0 and self._ends[first_idx - 1] == item_start < item_end:
+            ## zero-length items at end of touching previous child belong to the item
+            prev_child = self.children[first_idx - 1]
+            for zero_item in prev_child._pop_end_items(item_start):  # pylint: disable=W0212
+                item.add_item(zero_item)
+
+    ## detach zero-length items placed on given end of container
+    ## returns list of detached items (without nesting)
+    def _pop_end_items(self, end):
+        container = self
+        while container.children and container._ends[-1] == end:
+            last_child = container.children[-1]
+            if last_child.start() != end:
+                container = last_child
+                continue
+            del container.children[-1]
+            del container._starts[-1]
+            del container._ends[-1]
+            ## zero-length items are nested only in identical items
+            items_list = [last_child] + last_child.get_children()
+            for zero_item in items_list:
+                zero_item.children = []
+                zero_item._starts = []
+                zero_item._ends = []
+                zero_item.parent = None
+            return items_list
+        return []
+
+    ## add sorted and disjoint items
+    def _add_covered(self, items_list):
+        if self.children:
+            for child in items_list:
+                self.add_item(child)
             return
-        if item_start > self.children[-1].end():
-            # after last
-            self._append(item)
-            return
-
-        for idx, child in enumerate(self.children):
-            if item_end <= child.end():
-                if item_start >= child.start():
-                    # insert inside current item
-                    child.add_item(item)
-                    return
-                if item_end <= child.start():
-                    # fully before
-                    self._insert(idx, item)
-                    return
-                # partially before - invalid case
-                raise RuntimeError("invalid case")
-
-            if item_start <= child.start():
-                # fully covers - case already handled
-                raise RuntimeError("invalid case")
-
-            if item_start < child.end():
-                # partially after
-                raise RuntimeError("invalid case")
-
-            # fully after - continue the loop
-
-        # seems that element is full after
-        self._append(item)
+        ## batch reparenting
+        self.children = items_list
+        self._starts = [child.start() for child in items_list]
+        self._ends = [child.end() for child in items_list]
+        for child in items_list:
+            child.parent = self
 
     def _insert(self, index, item: "TreeItem"):
         self.children.insert(index, item)
-        new_level = self.level + 1
-        item.set_level(new_level)
+        self._starts.insert(index, item.start())
+        self._ends.insert(index, item.end())
+        item.parent = self
 
     def _append(self, item: "TreeItem"):
         self.children.append(item)
-        new_level = self.level + 1
-        item.set_level(new_level)
+        self._starts.append(item.start())
+        self._ends.append(item.end())
+        item.parent = self
 
 
 class TreeItem(TreeItemContainer):
@@ -131,6 +182,7 @@ class TreeItem(TreeItemContainer):
         self.event_data = event_data
         self._start = self.event_data["ts"]
         self._end = self.event_data["ts"] + self.event_data["dur"]
+        self.seq = next(_ITEMS_COUNTER)  # order of creation (decides nesting of identical intervals)
 
     def __repr__(self) -> str:
         return f"[{id(self)} l: {self.level} s: {self.start()} e: {self.end()}]"
@@ -152,10 +204,78 @@ class EventTree:
     def get_children(self):
         return self._container.get_children()
 
+    ## returns items of top level
+    def get_top_items(self) -> List[TreeItem]:
+        return self._container.children
+
+    def iter_children(self) -> Iterator[TreeItem]:
+        return self._container.iter_children()
+
+    def walk(self) -> Iterator[Tuple[TreeItem, int]]:
+        return self._container.walk()
+
     def add_event(self, event: Dict[Any, Any]):
         item = TreeItem(event)
         self._container.add_item(item)
 
-    def add_events(self, events_list):
+    ## engine:
+    ##    'bulk' -- sort events and nest them in one pass (default)
+    ##    'incremental' -- insert events one by one
+    ## bulk engine is used only on empty tree, otherwise events are added incrementally
+    def add_events(self, events_list, engine="bulk"):
+        if engine == "bulk" and not self._container.children:
+            self._build_events(events_list)
+            return
+        if engine not in ("bulk", "incremental"):
+            raise ValueError(f"unknown engine: {engine}")
         for event in events_list:
             self.add_event(event)
+
+    def _build_events(self, events_list):
+        items_list = [TreeItem(event) for event in events_list]
+        starts = [item.start() for item in items_list]
+        ends = [item.end() for item in items_list]
+        order, parents, _ = nest_intervals(starts, ends)
+        sorted_items = [items_list[idx] for idx in order]
+        for item, parent_pos in zip(sorted_items, parents):
+            ## items are sorted, so each item is appended after its siblings
+            if parent_pos < 0:
+                self._container._append(item)  # pylint: disable=W0212
+            else:
+                sorted_items[parent_pos]._append(item)  # pylint: disable=W0212
+
+
+## nest intervals using stack in one pass over intervals sorted by (start, -end)
+## parent of interval is the last interval containing it in sorted order, so zero-length
+## interval on boundary of two touching intervals is nested in the second one
+## identical intervals are nested in reversed order (last one is parent)
+## the same rule is used by incremental insertion ('TreeItemContainer.add_item')
+## returns tuple of lists:
+##    order -- indexes of intervals in pre-order of tree
+##    parents -- position of parent in 'order' list (-1 for top level items)
+##    levels -- nesting level of each item in 'order' list
+## raises RuntimeError on partially overlapping intervals
+def nest_intervals(starts, ends):
+    items_num = len(starts)
+    ## stable sorts from least significant key (cheaper than sorting with tuple keys)
+    order = list(range(items_num - 1, -1, -1))
+    order.sort(key=ends.__getitem__, reverse=True)
+    order.sort(key=starts.__getitem__)
+    parents = array("i", [-1]) * items_num
+    levels = array("i", [0]) * items_num
+    stack: List[int] = []  # positions in 'order'
+    last_end = None  # end of previous sibling
+    for pos, idx in enumerate(order):
+        item_start = starts[idx]
+        item_end = ends[idx]
+        while stack and ends[order[stack[-1]]] < item_end:
+            last_end = ends[order[stack.pop()]]
+        if last_end is not None and item_start < last_end:
+            # partially overlaps previous sibling
+            raise RuntimeError("invalid case")
+        if stack:
+            parents[pos] = stack[-1]
+            levels[pos] = len(stack)
+        stack.append(pos)
+        last_end = None
+    return order, parents, levels
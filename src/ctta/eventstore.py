@@ -0,0 +1,132 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+from array import array
+from typing import Dict, List, Any, Tuple
+
+from ctta.eventree import nest_intervals
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## columnar storage of complete events
+##
+## events are kept in parallel arrays instead of dicts and tree items objects. After nesting
+## arrays are ordered in pre-order of events tree (sorted by start time), so subtree of item
+## is continuous range of items with greater level.
+##
+## names are interned -- each unique string is stored once and referenced by id
+class EventStore:
+    def __init__(self):
+        self.names: List[str] = []  # interned strings
+        self._names_dict: Dict[str, int] = {}
+
+        self.ts = array("d")  # start time (in microseconds)
+        self.dur = array("d")  # duration (in microseconds)
+        self.name_id = array("i")  # id of event name
+        self.label_id = array("i")  # id of 'args.detail' or event name if detail is missing
+        self.level = array("i")  # nesting level (0 for top level items)
+        self.parent = array("i")  # index of parent item (-1 for top level items)
+
+        self._nested = True
+
+    def __len__(self):
+        return len(self.ts)
+
+    def intern(self, text: str) -> int:
+        name_id = self._names_dict.get(text)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(text)
+            self._names_dict[text] = name_id
+        return name_id
+
+    def get_name(self, index) -> str:
+        return self.names[self.name_id[index]]
+
+    def get_label(self, index) -> str:
+        return self.names[self.label_id[index]]
+
+    def get_end(self, index):
+        return self.ts[index] + self.dur[index]
+
+    def add_event(self, event: Dict[Any, Any]):
+        name = event.get("name")
+        label = None
+        args = event.get("args")
+        if args:
+            label = args.get("detail")
+        if label is None:
+            label = name
+        self.ts.append(event["ts"])
+        self.dur.append(event["dur"])
+        self.name_id.append(self.intern(name))
+        self.label_id.append(self.intern(label))
+        self._nested = False
+
+    def add_events(self, events_list):
+        for event in events_list:
+            self.add_event(event)
+
+    ## calculate nesting of events and reorder arrays to pre-order of tree
+    def nest(self):
+        if self._nested:
+            return
+        ends = [start + duration for start, duration in zip(self.ts, self.dur)]
+        order, parents, levels = nest_intervals(self.ts, ends)
+        del ends
+        self.ts = array("d", (self.ts[idx] for idx in order))
+        self.dur = array("d", (self.dur[idx] for idx in order))
+        self.name_id = array("i", (self.name_id[idx] for idx in order))
+        self.label_id = array("i", (self.label_id[idx] for idx in order))
+        self.level = levels
+        self.parent = parents
+        self._nested = True
+
+    ## sum of durations of direct children of each item
+    def get_children_durations(self):
+        self.nest()
+        children_dur = array("d", bytes(8 * len(self)))
+        dur = self.dur
+        for idx, parent in enumerate(self.parent):
+            if parent >= 0:
+                children_dur[parent] += dur[idx]
+        return children_dur
+
+
+## complete events partitioned by thread (pair of 'pid' and 'tid' fields of event)
+##
+## events of different threads can overlap, so events of each thread are kept and nested
+## in separate store. Stores do not share any state, so they can be processed independently.
+class ThreadStores:
+    def __init__(self):
+        ## ordered by first event of thread
+        self.stores: Dict[Tuple[Any, Any], EventStore] = {}
+
+    def __len__(self):
+        return sum(len(event_store) for event_store in self.stores.values())
+
+    def add_event(self, event: Dict[Any, Any]):
+        key = (event.get("pid"), event.get("tid"))
+        event_store = self.stores.get(key)
+        if event_store is None:
+            event_store = EventStore()
+            self.stores[key] = event_store
+        event_store.add_event(event)
+
+    def add_events(self, events_list):
+        for event in events_list:
+            self.add_event(event)
+
+    def get_stores(self) -> List[EventStore]:
+        return list(self.stores.values())
@@ -50,6 +50,29 @@ class BlockItem:
         return pos_dif <= self.w
 
 
+## width of rendered image in pixels
+IMAGE_WIDTH = 1200
+
+
+## options of removing small and deep blocks from flame graph
+@dataclass
+class PruneOptions:
+    min_dur: float = 0  # minimal duration of block given in microseconds
+    min_width: float = 0  # minimal width of block on rendered image given in pixels
+    max_depth: int = 0  # max number of levels (0 means no limit)
+    merge_small: bool = False  # merge adjacent pruned siblings into "other" block
+
+    def is_set(self):
+        return self.min_dur > 0 or self.min_width > 0 or self.max_depth > 0
+
+    ## returns minimal duration of block for image of given max width
+    def get_min_dur(self, maxw):
+        min_dur = float(self.min_dur)
+        if self.min_width > 0:
+            min_dur = max(min_dur, self.min_width * max(maxw, 100) / IMAGE_WIDTH)
+        return min_dur
+
+
 # 'top_blocks' can be None (then will not be rendered)
 def render(top_blocks: List[BlockItem], bottom_blocks: List[BlockItem], out_file_path: str):
     top_width = calc_max_width(top_blocks)
@@ -57,7 +80,7 @@ def render(top_blocks: List[BlockItem], bottom_blocks: List[BlockItem], out_file
     maxw = max(top_width, bottom_width, 100)
 
     with open(out_file_path, "w", encoding="utf-8") as out_file:
-        svg_content = flameprof.render_svg(top_blocks, bottom_blocks, maxw)
+        svg_content = flameprof.render_svg(top_blocks, bottom_blocks, maxw, width=IMAGE_WIDTH)
         out_file.write(svg_content)
 
 
@@ -0,0 +1,200 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+from array import array
+from typing import Dict, List, Tuple
+
+from ctta.analyzer import read_complete_events, is_bottom_event, prune_preorder, get_other_block
+from ctta.eventstore import EventStore, ThreadStores
+from ctta.flamegraph import BlockItem, PruneOptions
+from ctta.flamegraph import render as render_flamegraph
+from ctta.pool import map_items
+from ctta.cache import CachedReader
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## tree of call stacks with summed durations
+## stack is path of keys (event name, event label) from root to node, equal stacks share single node
+## memory depends on number of unique stacks, not on number of events
+class StackTree:
+    def __init__(self):
+        ## node 0 is virtual root
+        self.keys: List[Tuple[str, str]] = [("", "")]
+        self.dur = array("d", [0.0])
+        self.parent = array("i", [-1])
+        self.children: List[Dict[Tuple[str, str], int]] = [{}]
+
+    ## number of stacks
+    def __len__(self):
+        return len(self.keys) - 1
+
+    def get_child(self, node, key) -> int:
+        children = self.children[node]
+        child = children.get(key)
+        if child is None:
+            child = len(self.keys)
+            self.keys.append(key)
+            self.dur.append(0.0)
+            self.parent.append(node)
+            self.children.append({})
+            children[key] = child
+        return child
+
+    def add_store(self, event_store: EventStore):
+        event_store.nest()
+        names = event_store.names
+        ## node of each event (events are in pre-order, so parents are already mapped)
+        nodes = array("i", bytes(4 * len(event_store)))
+        for idx, parent in enumerate(event_store.parent):
+            parent_node = nodes[parent] if parent >= 0 else 0
+            key = (names[event_store.name_id[idx]], names[event_store.label_id[idx]])
+            node = self.get_child(parent_node, key)
+            self.dur[node] += event_store.dur[idx]
+            nodes[idx] = node
+
+    ## flat form of tree: list of tuples (parent index, name, label, duration)
+    ## parent is always placed before its children
+    def pack(self):
+        return [(self.parent[node], *self.keys[node], self.dur[node]) for node in range(1, len(self.keys))]
+
+    def add_packed(self, packed_list):
+        nodes = array("i", [0])
+        for parent, name, label, dur in packed_list:
+            node = self.get_child(nodes[parent], (name, label))
+            self.dur[node] += dur
+            nodes.append(node)
+
+    ## yields tuples (node, level) in pre-order, siblings are ordered by key (name, then label)
+    def walk(self):
+        stack = [(child, 0) for _, child in sorted(self.children[0].items(), reverse=True)]
+        while stack:
+            node, level = stack.pop()
+            yield node, level
+            children = self.children[node]
+            if children:
+                stack.extend((child, level + 1) for _, child in sorted(children.items(), reverse=True))
+
+
+## merged trees of top and bottom part of flame graph
+class FlameStacks:
+    def __init__(self):
+        self.top = StackTree()
+        self.bottom = StackTree()
+
+    def pack(self):
+        return self.top.pack(), self.bottom.pack()
+
+    def add_packed(self, packed):
+        self.top.add_packed(packed[0])
+        self.bottom.add_packed(packed[1])
+
+
+## draw single flame graph of all given files
+def draw_merged_flame_svg(files_list, out_svg_path, jobs=1, cache=None, prune: PruneOptions = None):
+    stacks = merge_flame_stacks(files_list, jobs=jobs, cache=cache)
+    blocks, bblocks = get_merged_flame_blocks(stacks, prune)
+    if not blocks and not bblocks:
+        _LOGGER.warning("no events found")
+        return
+    render_flamegraph(blocks, bblocks, out_svg_path)
+
+
+def merge_flame_stacks(files_list, jobs=1, cache=None) -> FlameStacks:
+    stacks = FlameStacks()
+    files_len = len(files_list)
+    reader = CachedReader(read_flame_stacks_packed, "flame-stacks", cache)
+    for idx, packed in enumerate(map_items(reader, files_list, jobs)):
+        _LOGGER.info("%s/%s: merging stacks of %s", idx, files_len, files_list[idx])
+        stacks.add_packed(packed)
+    _LOGGER.info("unique stacks: %s", len(stacks.top) + len(stacks.bottom))
+    return stacks
+
+
+## returns packed stacks of top and bottom part of flame graph of given file
+def read_flame_stacks_packed(data_file_path):
+    top_store = ThreadStores()
+    ## summary events are kept in single store (clang writes each "Total" event with its own tid)
+    bottom_store = EventStore()
+    complete_events = read_complete_events(data_file_path)
+    if complete_events is None:
+        _LOGGER.warning("unable to get trace events from file: %s", data_file_path)
+        return [], []
+    for event in complete_events:
+        if not is_bottom_event(event):
+            top_store.add_event(event)
+        else:
+            bottom_store.add_event(event)
+
+    ## stacks of all threads are merged
+    stacks = FlameStacks()
+    for thread_store in top_store.get_stores():
+        stacks.top.add_store(thread_store)
+    stacks.bottom.add_store(bottom_store)
+    return stacks.pack()
+
+
+## returns tuple (top blocks, bottom blocks) the same as 'ctta.analyzer.get_flame_blocks'
+def get_merged_flame_blocks(stacks: FlameStacks, prune: PruneOptions = None):
+    top_blocks = get_blocks_from_stacks(stacks.top, 0, prune)
+    bottom_blocks = get_blocks_from_stacks(stacks.bottom, 1, prune)
+    if not bottom_blocks:
+        return bottom_blocks, top_blocks
+    return top_blocks, bottom_blocks
+
+
+## children are placed next to each other from left edge of parent
+def get_blocks_from_stacks(stack_tree: StackTree, color, prune: PruneOptions = None):
+    nodes_list = []
+    starts = []
+    durs = []
+    levels = []
+    ## offset of next child of each level
+    offsets: List[float] = [0.0]
+    for node, level in stack_tree.walk():
+        del offsets[level + 1 :]
+        start = offsets[level]
+        dur = stack_tree.dur[node]
+        offsets[level] = start + dur
+        offsets.append(start)
+        nodes_list.append(node)
+        starts.append(start)
+        durs.append(dur)
+        levels.append(level)
+
+    min_dur = 0
+    max_depth = 0
+    merge_small = False
+    if prune is not None:
+        maxw = max((start + dur for start, dur in zip(starts, durs)), default=0)
+        min_dur = prune.get_min_dur(maxw)
+        max_depth = prune.max_depth
+        merge_small = prune.merge_small
+
+    blocks_list = []
+    for idx, x_pos, width, level, count in prune_preorder(starts, durs, levels, min_dur, max_depth, merge_small):
+        if idx is None:
+            blocks_list.append(get_other_block(x_pos, width, level, color, count))
+            continue
+        label = stack_tree.keys[nodes_list[idx]][1]
+        block = BlockItem(
+            x=x_pos,
+            w=width,
+            level=level,
+            color=color,
+            name=os.path.basename(label),
+            full_name=label,
+            hash_name=label,
+        )
+        blocks_list.append(block)
+    return blocks_list
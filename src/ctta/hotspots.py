@@ -0,0 +1,162 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import re
+import json
+import heapq
+import functools
+from typing import Dict, List, Tuple
+from dataclasses import dataclass
+
+from ctta.pool import map_items
+from ctta.cache import CachedReader
+from ctta.tracereader import iter_events
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+DEFAULT_EVENTS = ["InstantiateClass", "InstantiateFunction", "ParseClass"]
+
+DEFAULT_TOP = 30
+
+## overloaded operators containing angle brackets are not template arguments
+## brackets in parentheses (e.g. "std::array<int, (1 > 0)>") are not closing template arguments
+TEMPLATE_TOKEN_REGEX = re.compile(r"\boperator\s*(?:<=>|<<=|>>=|<<|>>|<=|>=|->\*|->|<|>|\(\))|->|[<>()]")
+
+
+@dataclass
+class HotSpot:
+    name: str = ""  # normalized 'detail' of event
+    event: str = ""  # name of event
+    dur: int = 0  # total duration given in microseconds (10^-6 s)
+    count: int = 0
+
+    def avg(self):
+        return float(self.dur) / self.count
+
+
+## replace template arguments with empty brackets, e.g. "std::vector<int>::push_back" -> "std::vector<>::push_back"
+def strip_template_args(name):
+    if "<" not in name:
+        return name
+    parts = []
+    depth = 0  # depth of template arguments
+    parens = 0  # depth of parentheses inside template arguments
+    last_pos = 0
+    for found in TEMPLATE_TOKEN_REGEX.finditer(name):
+        token = found.group()
+        if depth == 0:
+            parts.append(name[last_pos : found.start()])
+        last_pos = found.end()
+        if depth == 0:
+            if token == "<":
+                depth = 1
+            ## other tokens are copied
+            parts.append(token)
+            continue
+        if token == "(":
+            parens += 1
+        elif token == ")":
+            parens = max(parens - 1, 0)
+        elif parens > 0:
+            continue
+        elif token == "<":
+            depth += 1
+        elif token == ">":
+            depth -= 1
+            if depth == 0:
+                parts.append(token)
+    if depth == 0:
+        parts.append(name[last_pos:])
+    return "".join(parts)
+
+
+## returns dict of top hot spots by criteria: 'total', 'mean' and 'count'
+## durations and counts are exact: merged data keeps entry of each unique (event, name) pair,
+## so memory grows with number of unique names (only selection of top items is bounded)
+def find_hotspots(files_list, event_names=None, top=DEFAULT_TOP, strip_args=True, jobs=1, cache=None):
+    if not event_names:
+        event_names = DEFAULT_EVENTS
+    event_names = sorted(set(event_names))
+    reader_func = functools.partial(read_hotspots_data, event_names=event_names, strip_args=strip_args)
+    kind = f"hotspots:{','.join(event_names)}:{int(strip_args)}"
+    reader = CachedReader(reader_func, kind, cache)
+
+    merged_dict: Dict[Tuple[str, str], List[int]] = {}
+    files_len = len(files_list)
+    for idx, file_dict in enumerate(map_items(reader, files_list, jobs)):
+        _LOGGER.debug("%s/%s: hot spots of %s", idx, files_len, files_list[idx])
+        merge_hotspots_data(merged_dict, file_dict)
+
+    hotspots_iter = (HotSpot(name, event, dur, count) for (event, name), (dur, count) in merged_dict.items())
+    return select_top(hotspots_iter, top)
+
+
+## select top items of each criteria using heaps bounded to 'top' entries (single pass over items)
+def select_top(hotspots_iter, top):
+    heaps: Dict[str, list] = {"total": [], "mean": [], "count": []}
+    counter = 0  # keeps order of items of equal value
+    for item in hotspots_iter:
+        counter += 1
+        push_bounded(heaps["total"], (item.dur, -counter, item), top)
+        push_bounded(heaps["mean"], (item.avg(), -counter, item), top)
+        push_bounded(heaps["count"], (item.count, -counter, item), top)
+    return {key: [entry[2] for entry in sorted(heap, reverse=True)] for key, heap in heaps.items()}
+
+
+def push_bounded(heap, entry, size):
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif entry[:2] > heap[0][:2]:
+        heapq.heapreplace(heap, entry)
+
+
+## returns dict {(event name, normalized detail): [duration, count]} of given file
+def read_hotspots_data(data_path, event_names, strip_args=True):
+    names_set = set(event_names)
+    ## cache of normalized names
+    keys_dict: Dict[str, str] = {}
+    file_dict: Dict[Tuple[str, str], List[int]] = {}
+    try:
+        for event in iter_events(data_path):
+            ev_name = event.get("name")
+            if ev_name not in names_set:
+                continue
+            args = event.get("args")
+            if not args:
+                continue
+            detail = args.get("detail", "")
+            key_name = keys_dict.get(detail)
+            if key_name is None:
+                key_name = strip_template_args(detail) if strip_args else detail
+                keys_dict[detail] = key_name
+            key = (ev_name, key_name)
+            item_data = file_dict.get(key)
+            if item_data is None:
+                item_data = [0, 0]
+                file_dict[key] = item_data
+            item_data[0] += event.get("dur", 0)
+            item_data[1] += 1
+    except json.decoder.JSONDecodeError:
+        _LOGGER.warning("malformed trace events in %s", data_path)
+    return file_dict
+
+
+def merge_hotspots_data(merged_dict, file_dict):
+    for key, (dur, count) in file_dict.items():
+        item_data = merged_dict.get(key)
+        if item_data is None:
+            merged_dict[key] = [dur, count]
+            continue
+        item_data[0] += dur
+        item_data[1] += count
@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import json
+import importlib
+import mmap
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## native parsers ordered from the fastest one
+NATIVE_BACKENDS = ["orjson", "simdjson", "ujson"]
+
+## backends:
+##    auto -- fastest available native parser (standard library parser if there is no native one),
+##            streaming reader for big files
+##    stream -- incremental reader (see 'ctta.tracereader')
+##    orjson, simdjson, ujson -- native parsers (have to be installed)
+##    json -- standard library parser
+BACKENDS = ["auto", "stream"] + NATIVE_BACKENDS + ["json"]
+
+## backends able to parse memory buffer without copying it
+BUFFER_BACKENDS = ["orjson"]
+
+## files bigger than the limit are read by streaming reader in 'auto' mode
+AUTO_STREAM_SIZE = 64 * 1024 * 1024
+
+
+_DEFAULT_BACKEND = "auto"
+
+_LOADS_DICT = {}
+
+
+def set_default_backend(backend):
+    global _DEFAULT_BACKEND  # pylint: disable=W0603
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown JSON backend: {backend}")
+    _DEFAULT_BACKEND = backend
+
+
+def get_default_backend():
+    return _DEFAULT_BACKEND
+
+
+## returns 'loads' function of given parser or None if parser is not available
+def get_loads(backend):
+    if backend in _LOADS_DICT:
+        return _LOADS_DICT[backend]
+    loads_func = None
+    if backend == "json":
+        loads_func = json.loads
+    elif backend in NATIVE_BACKENDS:
+        try:
+            module = importlib.import_module(backend)
+            loads_func = module.loads
+        except ImportError:
+            loads_func = None
+    _LOADS_DICT[backend] = loads_func
+    return loads_func
+
+
+def get_available_backends():
+    return [backend for backend in BACKENDS if backend in ("auto", "stream") or get_loads(backend) is not None]
+
+
+## resolve 'auto' and validate availability of parser
+## returns name of parser or "stream"
+def resolve_backend(backend=None, file_size=0):
+    if backend is None:
+        backend = _DEFAULT_BACKEND
+    if backend == "auto":
+        if file_size > AUTO_STREAM_SIZE:
+            return "stream"
+        for native in NATIVE_BACKENDS:
+            if get_loads(native) is not None:
+                return native
+        return "json"
+    if backend == "stream":
+        return backend
+    if get_loads(backend) is None:
+        raise ValueError(f"JSON backend not available: {backend}")
+    return backend
+
+
+## returns read-only memory map of given file or None if file is empty (empty file cannot be mapped)
+def map_file(data_file):
+    if os.fstat(data_file.fileno()).st_size < 1:
+        return None
+    return mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+## decode whole file with given parser
+## file is memory mapped, so raw content is not buffered by Python and not decoded to 'str'
+## raises 'json.decoder.JSONDecodeError' on malformed content
+def load_file(file_path, backend):
+    loads_func = get_loads(backend)
+    with open(file_path, "rb") as data_file:
+        data_map = map_file(data_file)
+        if data_map is None:
+            return loads_data(b"", loads_func)
+        with data_map:
+            if backend in BUFFER_BACKENDS:
+                ## parse directly from mapped pages
+                with memoryview(data_map) as data_view:
+                    return loads_data(data_view, loads_func)
+            ## parser requires 'bytes' -- single copy of raw content
+            return loads_data(data_map[:], loads_func)
+
+
+def loads_data(data, loads_func):
+    try:
+        return loads_func(data)
+    except ValueError as exc:
+        if isinstance(exc, (json.decoder.JSONDecodeError, UnicodeDecodeError)):
+            raise
+        ## native parsers have their own exceptions
+        raise json.decoder.JSONDecodeError(str(exc), "", 0) from exc
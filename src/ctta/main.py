@@ -12,13 +12,25 @@ import sys
 import os
 import logging
 import argparse
+import functools
 
 import pprint
 
 from glob import glob
 
 # from ctta.analyzer import draw_flame_svg
-from ctta.analyzer import analyze, run_callgrind_view, draw_flame_svg
+from ctta.analyzer import analyze, run_callgrind_view, draw_flame_svg, get_flame_kind
+from ctta.analyzestate import analyze_update
+from ctta import numpystats
+from ctta import selftime
+from ctta.hotspots import find_hotspots, DEFAULT_EVENTS, DEFAULT_TOP
+from ctta.flamemerge import draw_merged_flame_svg
+from ctta.collapsed import export_collapsed
+from ctta.report import generate_reports, SourceSink, FlameSink, CallgrindSink
+from ctta.pool import map_items
+from ctta.cache import ResultCache, DEFAULT_MAX_SIZE
+from ctta.flamegraph import PruneOptions
+from ctta.jsonbackend import BACKENDS, set_default_backend, resolve_backend, get_available_backends
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -34,34 +46,153 @@ def process_analyze(args):
     excludes = args.exclude
     out_file_path = args.outfile
     _LOGGER.info("parsing files: %s", files_list)
-    data_dict = analyze(files_list, excludes)
+    cache = create_cache(args)
+    if args.self_time:
+        if args.engine != "python" or args.state:
+            _LOGGER.warning("--self-time ignores --engine and --state")
+        data_dict = selftime.analyze_self(files_list, excludes, jobs=args.jobs, cache=cache)
+    elif args.engine == "numpy":
+        if not numpystats.is_available():
+            _LOGGER.error("numpy engine requires numpy package")
+            return 1
+        if args.state:
+            _LOGGER.warning("--state is not supported by numpy engine - running full analysis")
+        data_dict = numpystats.analyze_stats(files_list, excludes, jobs=args.jobs, cache=cache)
+    elif args.state:
+        data_dict = analyze_update(files_list, excludes, args.state, update=args.update, jobs=args.jobs, cache=cache)
+    else:
+        if args.update:
+            _LOGGER.warning("--update requires --state - running full analysis")
+        data_dict = analyze(files_list, excludes, jobs=args.jobs, cache=cache)
+    evict_cache(cache)
 
     pprint.pprint(data_dict, indent=4, sort_dicts=False)
 
     with open(out_file_path, "w", encoding="utf-8") as out_file:
         pprint.pprint(data_dict, out_file, indent=4, sort_dicts=False)
+    return 0
 
 
 def process_flamegraph(args):
-    data_file = args.file
+    if not args.merge and (len(args.file) != 1 or args.dirs):
+        _LOGGER.error("single JSON file expected (use --merge to draw multiple files)")
+        return 1
+
     out_svg_path = args.outfile
-    _LOGGER.info("parsing file: %s", data_file)
-    draw_flame_svg(data_file, out_svg_path)
+    cache = create_cache(args)
+    prune = create_prune_options(args)
+    if args.merge:
+        files_list = find_files(args.file, args.dirs)
+        _LOGGER.info("merging files: %s", len(files_list))
+        draw_merged_flame_svg(files_list, out_svg_path, jobs=args.jobs, cache=cache, prune=prune)
+    else:
+        data_file = args.file[0]
+        _LOGGER.info("parsing file: %s", data_file)
+        draw_flame_svg(data_file, out_svg_path, cache=cache, prune=prune)
+    evict_cache(cache)
+    return 0
 
 
 def process_flamegraphs(args):
     files_list = find_files(args.files, args.dirs)
+    cache = create_cache(args)
+    prune = create_prune_options(args)
+    if not args.force:
+        ## make-like check of modification time
+        outdated_list = [
+            file_path
+            for file_path in files_list
+            if not is_up_to_date(f"{file_path}.svg", file_path) and not is_empty_flame(file_path, cache, prune)
+        ]
+        _LOGGER.info("skipping up-to-date flame graphs: %s", len(files_list) - len(outdated_list))
+        files_list = outdated_list
     files_len = len(files_list)
-    for idx, file_path in enumerate(files_list):
+    draw_func = functools.partial(draw_flame_file, cache=cache, prune=prune)
+    drawn_list = map_items(draw_func, files_list, args.jobs)
+    for idx, file_path in enumerate(drawn_list):
         _LOGGER.info("%s/%s: drawing flamegraph of %s", idx, files_len, file_path)
-        out_svg_path = f"{file_path}.svg"
-        draw_flame_svg(file_path, out_svg_path)
+    evict_cache(cache)
+
+
+def draw_flame_file(file_path, cache=None, prune=None):
+    out_svg_path = f"{file_path}.svg"
+    if not draw_flame_svg(file_path, out_svg_path, cache=cache, prune=prune) and cache is not None:
+        ## file without events (or not a trace file) does not get image -- stamp in cache
+        ## marks it as up to date, otherwise it would be parsed on each run
+        cache.store(get_empty_flame_kind(prune), file_path, True)
+    return file_path
+
+
+## is there stamp of file without flame graph? (stamp is valid until file is modified)
+def is_empty_flame(file_path, cache=None, prune=None):
+    if cache is None:
+        return False
+    found, _ = cache.load(get_empty_flame_kind(prune), file_path)
+    return found
+
+
+def get_empty_flame_kind(prune=None):
+    return f"{get_flame_kind(prune)}:empty"
+
+
+## is output file newer than source file?
+def is_up_to_date(out_path, source_path):
+    try:
+        out_mtime = os.stat(out_path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return out_mtime >= os.stat(source_path).st_mtime_ns
 
 
 def process_callgrind(args):
     files_list = find_files(args.files, args.dirs)
     out_callgrind_path = args.outfile
-    run_callgrind_view(files_list, out_callgrind_path)
+    cache = create_cache(args)
+    run_callgrind_view(files_list, out_callgrind_path, jobs=args.jobs, cache=cache, merge=args.merge)
+    evict_cache(cache)
+
+
+def process_collapsed(args):
+    files_list = find_files(args.files, args.dirs)
+    cache = create_cache(args)
+    export_collapsed(files_list, args.outfile, jobs=args.jobs, cache=cache)
+    evict_cache(cache)
+
+
+def process_hotspots(args):
+    files_list = find_files(args.files, args.dirs)
+    cache = create_cache(args)
+    hotspots_dict = find_hotspots(
+        files_list,
+        event_names=args.events,
+        top=args.top,
+        strip_args=not args.keep_template_args,
+        jobs=args.jobs,
+        cache=cache,
+    )
+    evict_cache(cache)
+
+    pprint.pprint(hotspots_dict, indent=4, sort_dicts=False)
+
+    if args.outfile:
+        with open(args.outfile, "w", encoding="utf-8") as out_file:
+            pprint.pprint(hotspots_dict, out_file, indent=4, sort_dicts=False)
+
+
+def process_report(args):
+    files_list = find_files(args.files, args.dirs)
+    sinks_list = []
+    if args.analyze_outfile:
+        sinks_list.append(SourceSink(args.exclude, args.analyze_outfile))
+    if args.flamegraphs:
+        sinks_list.append(FlameSink(create_prune_options(args)))
+    if args.callgrind_outfile:
+        sinks_list.append(CallgrindSink(args.callgrind_outfile, merge=args.callgrind_merge))
+    if not sinks_list:
+        _LOGGER.error("no report selected - use --analyze-outfile, --flamegraphs or --callgrind-outfile")
+        return 1
+    generate_reports(files_list, sinks_list, jobs=args.jobs)
+    return 0
 
 
 # =============================================================
@@ -76,6 +207,28 @@ def analyze_code(files_list, exclude_list, out_file_path):
         pprint.pprint(data_dict, out_file, indent=4, sort_dicts=False)
 
 
+def create_cache(args):
+    if not args.cache_dir:
+        return None
+    max_size = args.cache_size * 1024 * 1024
+    return ResultCache(args.cache_dir, max_size)
+
+
+def create_prune_options(args):
+    prune = PruneOptions(
+        min_dur=args.min_duration, min_width=args.min_width, max_depth=args.max_depth, merge_small=args.merge_small
+    )
+    if not prune.is_set():
+        return None
+    return prune
+
+
+def evict_cache(cache):
+    if cache is None:
+        return
+    cache.evict()
+
+
 def find_files(files, dirs):
     ret_list = set()
     ret_list.update(files)
@@ -91,6 +244,45 @@ def find_files(files, dirs):
 # =============================================================
 
 
+def add_cache_arguments(subparser):
+    subparser.add_argument(
+        "--cache-dir", action="store", required=False, help="Directory of cache of parsed trace files"
+    )
+    subparser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_SIZE // (1024 * 1024),
+        help="Max size of cache in MB (least recently used entries are removed)",
+    )
+
+
+def add_prune_arguments(subparser):
+    subparser.add_argument(
+        "--min-duration",
+        type=float,
+        default=0,
+        help="Skip flame graph blocks shorter than given value (in microseconds)",
+    )
+    subparser.add_argument(
+        "--min-width", type=float, default=0, help="Skip flame graph blocks narrower than given value (in pixels)"
+    )
+    subparser.add_argument(
+        "--max-depth", type=int, default=0, help="Max number of levels of flame graph (0 means no limit)"
+    )
+    subparser.add_argument(
+        "--merge-small", action="store_true", help="Merge adjacent skipped blocks into 'other' block"
+    )
+
+
+def add_json_arguments(subparser):
+    subparser.add_argument(
+        "--json-backend",
+        choices=BACKENDS,
+        default="auto",
+        help="JSON parser used to read trace files ('auto' selects the fastest available one)",
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="clang-time-trace-analyzer")
     parser.add_argument("--listtools", action="store_true", help="List tools")
@@ -105,14 +297,38 @@ def main():
     subparser.description = description
     subparser.set_defaults(func=process_analyze)
     subparser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
+    add_cache_arguments(subparser)
+    add_json_arguments(subparser)
     subparser.add_argument("-f", "--files", nargs="+", default=[], help="Files to analyze")
     subparser.add_argument(
         "-d", "--dirs", nargs="+", default=[], help="Directories to analyze (will recursively search for JSON files)"
     )
+    subparser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of parallel worker processes (0 means number of CPUs)"
+    )
     subparser.add_argument(
         "--exclude", nargs="+", default=[], help="Space separated list of items to exclude. e.g. '/usr/*'"
     )
     subparser.add_argument("--outfile", action="store", required=False, help="Path to output file")
+    subparser.add_argument(
+        "--state", action="store", required=False, help="Path to state file (per-file contributions to results)"
+    )
+    subparser.add_argument(
+        "--update",
+        action="store_true",
+        help="Update results stored in state file with changed files only (requires --state)",
+    )
+    subparser.add_argument(
+        "--self-time",
+        action="store_true",
+        help="Report inclusive and self time (without nested includes) of headers and header including them",
+    )
+    subparser.add_argument(
+        "--engine",
+        choices=["python", "numpy"],
+        default="python",
+        help="Aggregation engine ('numpy' additionally calculates mean, median, p95 and max, requires numpy)",
+    )
 
     ## =================================================
 
@@ -121,8 +337,26 @@ def main():
     subparser.description = description
     subparser.set_defaults(func=process_flamegraph)
     subparser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
-    subparser.add_argument("-f", "--file", action="store", required=True, help="JSON file to analyze")
+    add_cache_arguments(subparser)
+    add_json_arguments(subparser)
+    subparser.add_argument(
+        "-f", "--file", nargs="+", default=[], help="JSON file to analyze (multiple files are allowed with --merge)"
+    )
+    subparser.add_argument(
+        "-d",
+        "--dirs",
+        nargs="+",
+        default=[],
+        help="Directories to analyze (will recursively search for JSON files, requires --merge)",
+    )
+    subparser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of parallel worker processes (0 means number of CPUs)"
+    )
     subparser.add_argument("--outfile", action="store", required=True, help="Path to output file")
+    subparser.add_argument(
+        "--merge", action="store_true", help="Draw single flame graph of aggregated call stacks of all given files"
+    )
+    add_prune_arguments(subparser)
 
     ## =================================================
 
@@ -131,10 +365,22 @@ def main():
     subparser.description = description
     subparser.set_defaults(func=process_flamegraphs)
     subparser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
+    add_cache_arguments(subparser)
+    add_json_arguments(subparser)
     subparser.add_argument("-f", "--files", nargs="+", default=[], help="Files to analyze")
     subparser.add_argument(
         "-d", "--dirs", nargs="+", default=[], help="Directories to analyze (will recursively search for JSON files)"
     )
+    subparser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of parallel worker processes (0 means number of CPUs)"
+    )
+    subparser.add_argument(
+        "--force",
+        action="store_true",
+        help="Draw all flame graphs (by default SVGs newer than JSONs are skipped, as well as JSONs without events"
+        " recorded in --cache-dir)",
+    )
+    add_prune_arguments(subparser)
 
     ## =================================================
 
@@ -143,14 +389,116 @@ def main():
     subparser.description = description
     subparser.set_defaults(func=process_callgrind)
     subparser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
+    add_cache_arguments(subparser)
+    add_json_arguments(subparser)
     subparser.add_argument("-f", "--files", nargs="+", default=[], help="Files to analyze")
     subparser.add_argument(
         "-d", "--dirs", nargs="+", default=[], help="Directories to analyze (will recursively search for JSON files)"
     )
+    subparser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of parallel worker processes (0 means number of CPUs)"
+    )
+    subparser.add_argument(
+        "--outfile", action="store", required=False, help="Path to output file (compressed if ends with '.gz')"
+    )
+    subparser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Merge functions of equal names of all files (output size depends on number of unique names)",
+    )
+
+    ## =================================================
+
+    description = "export call stacks of JSON files in collapsed format (input of external flame graph tools)"
+    subparser = subparsers.add_parser("collapsed", help=description)
+    subparser.description = description
+    subparser.set_defaults(func=process_collapsed)
+    subparser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
+    add_cache_arguments(subparser)
+    add_json_arguments(subparser)
+    subparser.add_argument("-f", "--files", nargs="+", default=[], help="Files to analyze")
+    subparser.add_argument(
+        "-d", "--dirs", nargs="+", default=[], help="Directories to analyze (will recursively search for JSON files)"
+    )
+    subparser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of parallel worker processes (0 means number of CPUs)"
+    )
+    subparser.add_argument(
+        "--outfile", action="store", required=True, help="Path to output file (compressed if ends with '.gz')"
+    )
+
+    ## =================================================
+
+    description = "find the most expensive templates (or other events) of JSON files"
+    subparser = subparsers.add_parser("hotspots", help=description)
+    subparser.description = (
+        f"{description} (note: durations of each unique name are kept in memory until all files are"
+        " processed, so memory grows with number of unique names -- consider default stripping of"
+        " template arguments on large projects)"
+    )
+    subparser.set_defaults(func=process_hotspots)
+    subparser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
+    add_cache_arguments(subparser)
+    add_json_arguments(subparser)
+    subparser.add_argument("-f", "--files", nargs="+", default=[], help="Files to analyze")
+    subparser.add_argument(
+        "-d", "--dirs", nargs="+", default=[], help="Directories to analyze (will recursively search for JSON files)"
+    )
+    subparser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of parallel worker processes (0 means number of CPUs)"
+    )
+    subparser.add_argument(
+        "--events",
+        nargs="+",
+        default=DEFAULT_EVENTS,
+        help=f"Names of events to aggregate (default: {' '.join(DEFAULT_EVENTS)})",
+    )
+    subparser.add_argument(
+        "--top", type=int, default=DEFAULT_TOP, help=f"Number of items in each ranking (default: {DEFAULT_TOP})"
+    )
+    subparser.add_argument(
+        "--keep-template-args",
+        action="store_true",
+        help="Do not strip template arguments from names (by default all instantiations of template are grouped;"
+        " keeping arguments increases number of unique names and so memory usage)",
+    )
     subparser.add_argument("--outfile", action="store", required=False, help="Path to output file")
 
     ## =================================================
 
+    description = "generate multiple reports reading each JSON file only once"
+    subparser = subparsers.add_parser("report", help=description)
+    subparser.description = description
+    subparser.set_defaults(func=process_report)
+    subparser.add_argument("-la", "--logall", action="store_true", help="Log all messages")
+    add_json_arguments(subparser)
+    subparser.add_argument("-f", "--files", nargs="+", default=[], help="Files to analyze")
+    subparser.add_argument(
+        "-d", "--dirs", nargs="+", default=[], help="Directories to analyze (will recursively search for JSON files)"
+    )
+    subparser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of parallel worker processes (0 means number of CPUs)"
+    )
+    subparser.add_argument(
+        "--exclude", nargs="+", default=[], help="Space separated list of items to exclude from analyze report"
+    )
+    subparser.add_argument(
+        "--analyze-outfile", action="store", required=False, help="Path to output file of analyze report"
+    )
+    subparser.add_argument("--flamegraphs", action="store_true", help="Draw flame graphs next to given JSONs")
+    add_prune_arguments(subparser)
+    subparser.add_argument(
+        "--callgrind-outfile",
+        action="store",
+        required=False,
+        help="Path to output callgrind file (compressed if ends with '.gz')",
+    )
+    subparser.add_argument(
+        "--callgrind-merge", action="store_true", help="Merge functions of equal names in callgrind report"
+    )
+
+    ## =================================================
+
     args = parser.parse_args()
 
     # logging.basicConfig(level=logging.INFO)
@@ -167,7 +515,19 @@ def main():
         sys.exit(1)
         return 1
 
-    args.func(args)
+    json_backend = getattr(args, "json_backend", None)
+    if json_backend:
+        try:
+            resolve_backend(json_backend)
+        except ValueError as exc:
+            _LOGGER.error("%s, available backends: %s", exc, get_available_backends())
+            return 1
+        set_default_backend(json_backend)
+
+    ## commands return non-zero exit code on invalid arguments
+    exit_code = args.func(args)
+    if exit_code:
+        return exit_code
 
     _LOGGER.info("Completed")
     return 0
@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import re
+from typing import Dict, List
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## max number of memoized decisions (memo is cleared when limit is reached)
+MEMO_LIMIT = 256 * 1024
+
+
+## node of prefix trie -- children are indexed by path components
+class PrefixNode:
+    def __init__(self):
+        self.children: Dict[str, "PrefixNode"] = {}
+        ## beginnings of next component (empty string matches any remaining)
+        self.tails: List[str] = []
+
+
+## trie of path prefixes
+## prefix "/usr/incl" is stored as components ["", "usr"] and tail "incl"
+class PrefixTrie:
+    def __init__(self):
+        self.root = PrefixNode()
+
+    def __bool__(self):
+        return bool(self.root.children) or bool(self.root.tails)
+
+    def add(self, prefix):
+        components = prefix.split("/")
+        node = self.root
+        for component in components[:-1]:
+            child = node.children.get(component)
+            if child is None:
+                child = PrefixNode()
+                node.children[component] = child
+            node = child
+        tail = components[-1]
+        if tail not in node.tails:
+            node.tails.append(tail)
+
+    ## does 'path' start with any of stored prefixes?
+    def match(self, path):
+        node = self.root
+        for component in path.split("/"):
+            for tail in node.tails:
+                if component.startswith(tail):
+                    return True
+            node = node.children.get(component)
+            if node is None:
+                return False
+        return False
+
+
+## matcher of exclude patterns
+##
+## patterns:
+##    - without wildcard -- item has to be equal to pattern
+##    - with '*' wildcard -- matches any sequence of characters, item has to start with match of pattern
+##      (e.g. '/usr/*' matches all items under '/usr/'), other characters are matched literally
+## patterns ending with single '*' are matched by prefix trie, remaining ones by single combined regex
+## decisions are memoized per item
+class PathMatcher:
+    def __init__(self, patterns_list=None):
+        self.exact_set = set()
+        self.prefix_trie = PrefixTrie()
+        self.regex = None
+        self._memo: Dict[str, bool] = {}
+
+        regex_list = []
+        for pattern in patterns_list or []:
+            if not pattern:
+                continue
+            wildcard_pos = pattern.find("*")
+            if wildcard_pos < 0:
+                self.exact_set.add(pattern)
+            elif wildcard_pos == len(pattern) - 1:
+                self.prefix_trie.add(pattern[:-1])
+            else:
+                regex_list.append(translate_pattern(pattern))
+
+        if regex_list:
+            ## sorting makes regex independent of order of patterns
+            combined = "|".join(sorted(set(regex_list)))
+            self.regex = re.compile(f"(?:{combined})", re.DOTALL)
+
+    def match(self, item):
+        decision = self._memo.get(item)
+        if decision is not None:
+            return decision
+        decision = self._match(item)
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[item] = decision
+        return decision
+
+    def _match(self, item):
+        if item in self.exact_set:
+            return True
+        if self.prefix_trie.match(item):
+            return True
+        if self.regex is not None and self.regex.match(item):
+            return True
+        return False
+
+
+## convert wildcard pattern to regex (without anchoring at end)
+def translate_pattern(pattern):
+    return ".*".join(re.escape(part) for part in pattern.split("*"))
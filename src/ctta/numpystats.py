@@ -0,0 +1,173 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import json
+from array import array
+from typing import Dict, List
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:
+    ## numpy is optional dependency
+    np = None
+
+from ctta.analyzer import ExcludeItemFilter
+from ctta.pathintern import PathInterner, get_interner
+from ctta.pool import map_items
+from ctta.cache import CachedReader
+from ctta.tracereader import iter_events
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def is_available():
+    return np is not None
+
+
+## statistics of 'Source' events of single header
+@dataclass
+class Stats:
+    dur: float = 0  # sum of durations given in microseconds (10^-6 s)
+    count: int = 0
+    mean: float = 0.0
+    median: float = 0.0
+    p95: float = 0.0
+    max: float = 0
+
+    def avg(self):
+        return self.mean
+
+
+## the same as 'ctta.analyzer.analyze', but results contain more statistics
+## all durations are kept in arrays and reduced at once
+def analyze_stats(files_list, exclude_list, jobs=1, cache=None) -> Dict[str, Stats]:
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    exclude_filter = ExcludeItemFilter(exclude_list)
+    _LOGGER.info("exclude list: %s", exclude_filter.raw_exclude)
+
+    aggregator = StatsAggregator(exclude_filter)
+    reader = CachedReader(read_source_samples, "source-samples", cache)
+    for samples in map_items(reader, files_list, jobs):
+        aggregator.add_samples(samples)
+    return aggregator.reduce()
+
+
+## returns tuple (paths list, path index of each event, duration of each event)
+## paths are ordered by first occurrence in file
+def read_source_samples(data_path):
+    interner = get_interner()
+    ids_list = array("i")
+    durs_list = array("d")
+    try:
+        for event in iter_events(data_path):
+            if event.get("name") != "Source":
+                continue
+            args = event.get("args", {})
+            if not args:
+                continue
+            ids_list.append(interner.get_id(args.get("detail", "")))
+            durs_list.append(event.get("dur", 0))
+    except json.decoder.JSONDecodeError:
+        return [], np.zeros(0, dtype=np.int32), np.zeros(0)
+
+    ids_arr = np.frombuffer(ids_list, dtype=np.int32)
+    unique_ids, first_index, inverse = np.unique(ids_arr, return_index=True, return_inverse=True)
+    ## ids of process interner are not valid outside of current process -- replace them with local indexes
+    order = np.argsort(first_index, kind="stable")
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    paths_list = [interner.get_path(path_id) for path_id in unique_ids[order].tolist()]
+    return paths_list, rank[inverse.reshape(-1)], np.frombuffer(durs_list, dtype=np.float64)
+
+
+##
+class StatsAggregator:
+    def __init__(self, exclude_filter: ExcludeItemFilter = None):
+        self.exclude_filter = exclude_filter
+        ## ids in order of first occurrence
+        self.interner = PathInterner()
+        self._ids_chunks: List = []
+        self._durs_chunks: List = []
+
+    def add_samples(self, samples):
+        paths_list, local_ids, durs = samples
+        if not paths_list:
+            return
+        mapping = np.empty(len(paths_list), dtype=np.int64)
+        for idx, path in enumerate(paths_list):
+            if self.exclude_filter is not None and self.exclude_filter.excluded(path):
+                mapping[idx] = -1
+            else:
+                mapping[idx] = self.interner.intern(path)
+        path_ids = mapping[local_ids]
+        valid = path_ids >= 0
+        self._ids_chunks.append(path_ids[valid])
+        self._durs_chunks.append(durs[valid])
+
+    ## returns dict of statistics sorted by mean duration
+    def reduce(self) -> Dict[str, Stats]:
+        paths_num = len(self.interner)
+        if paths_num < 1:
+            return {}
+        path_ids = np.concatenate(self._ids_chunks)
+        durs = np.concatenate(self._durs_chunks)
+
+        counts = np.bincount(path_ids, minlength=paths_num)
+        sums = np.bincount(path_ids, weights=durs, minlength=paths_num)
+        means = sums / counts
+        maxs = np.full(paths_num, -np.inf)
+        np.maximum.at(maxs, path_ids, durs)
+
+        ## durations sorted inside each group of path
+        order = np.lexsort((durs, path_ids))
+        sorted_durs = durs[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        medians = group_quantile(sorted_durs, starts, counts, 0.5)
+        p95s = group_quantile(sorted_durs, starts, counts, 0.95)
+
+        ## stable sort keeps order of first occurrence for equal means
+        ranking = np.argsort(means, kind="stable")
+
+        ret_dict = {}
+        for path_id in ranking.tolist():
+            ret_dict[self.interner.get_path(path_id)] = Stats(
+                dur=to_number(sums[path_id]),
+                count=int(counts[path_id]),
+                mean=float(means[path_id]),
+                median=float(medians[path_id]),
+                p95=float(p95s[path_id]),
+                max=to_number(maxs[path_id]),
+            )
+        return ret_dict
+
+
+## quantile of each group with linear interpolation (the same as 'numpy.quantile')
+## groups are given by 'starts' and 'counts' in sorted array
+def group_quantile(sorted_values, starts, counts, quantile):
+    position = (counts - 1) * quantile
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    fraction = position - lower
+    lower_values = sorted_values[starts + lower]
+    upper_values = sorted_values[starts + upper]
+    return lower_values + (upper_values - lower_values) * fraction
+
+
+## durations are stored as floats -- convert integral values back to int
+def to_number(value):
+    value = float(value)
+    if value.is_integer():
+        return int(value)
+    return value
@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+from typing import Dict, List
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## max number of memoized raw paths (memo is cleared when limit is reached)
+MEMO_LIMIT = 256 * 1024
+
+
+## table of normalized paths -- each unique path gets integer id
+## ids are valid only in process that created them
+class PathInterner:
+    def __init__(self):
+        self.paths: List[str] = []
+        self._ids: Dict[str, int] = {}
+        ## raw path -> id of normalized path
+        self._memo: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.paths)
+
+    ## returns id of already normalized path
+    def intern(self, path: str) -> int:
+        path_id = self._ids.get(path)
+        if path_id is None:
+            path_id = len(self.paths)
+            self.paths.append(path)
+            self._ids[path] = path_id
+        return path_id
+
+    ## returns id of normalized raw path
+    def get_id(self, raw_path: str) -> int:
+        path_id = self._memo.get(raw_path)
+        if path_id is not None:
+            return path_id
+        path_id = self.intern(os.path.normpath(raw_path))
+        if len(self._memo) >= MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[raw_path] = path_id
+        return path_id
+
+    def get_path(self, path_id: int) -> str:
+        return self.paths[path_id]
+
+    ## returns normalized path (the same object for equal paths)
+    def normalize(self, raw_path: str) -> str:
+        return self.paths[self.get_id(raw_path)]
+
+
+_INTERNER = PathInterner()
+
+
+## returns interner shared by whole process
+def get_interner() -> PathInterner:
+    return _INTERNER
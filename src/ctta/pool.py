@@ -0,0 +1,51 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import multiprocessing
+
+from ctta.jsonbackend import get_default_backend, set_default_backend
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def init_worker(json_backend):
+    set_default_backend(json_backend)
+
+
+def get_jobs_number(jobs):
+    if jobs is None:
+        return 1
+    if jobs < 1:
+        ## use all available cores
+        return os.cpu_count() or 1
+    return jobs
+
+
+## yields 'func(item)' for each item of 'items_list' keeping order of the list
+## 'func' have to be picklable (module level function or 'functools.partial')
+def map_items(func, items_list, jobs=1):
+    jobs = get_jobs_number(jobs)
+    items_len = len(items_list)
+    if jobs < 2 or items_len < 2:
+        for item in items_list:
+            yield func(item)
+        return
+
+    jobs = min(jobs, items_len)
+    ## bigger chunks reduce IPC overhead on large lists
+    chunk_size = max(1, min(16, items_len // (jobs * 4)))
+    _LOGGER.info("starting %s worker processes", jobs)
+    ## pass global configuration to workers (needed when processes are spawned instead of forked)
+    init_args = (get_default_backend(),)
+    with multiprocessing.Pool(processes=jobs, initializer=init_worker, initargs=init_args) as pool:
+        yield from pool.imap(func, items_list, chunk_size)
@@ -0,0 +1,252 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import json
+import functools
+import pprint
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+from ctta.analyzer import (
+    Data,
+    ExcludeItemFilter,
+    get_data_id,
+    add_data,
+    merge_data,
+    sort_data,
+    is_bottom_event,
+    get_flame_blocks,
+    pack_store_entries,
+)
+from ctta.eventstore import EventStore, ThreadStores
+from ctta.pathintern import get_interner
+from ctta.flamegraph import PruneOptions
+from ctta.flamegraph import render as render_flamegraph
+from ctta.callgrind import CallgrindWriter, MergedEntries, open_callgrind_file
+from ctta.pool import map_items
+from ctta.tracereader import iter_events
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## receives events of single trace file (executed in worker process)
+class EventCollector(ABC):
+    @abstractmethod
+    def add_event(self, event):
+        pass
+
+    ## returns partial result of file (has to be picklable)
+    ## 'complete' is False if file is malformed and only part of events was received
+    @abstractmethod
+    def result(self, data_path, complete):
+        pass
+
+
+## report generated from trace files
+##
+## sink works in two stages:
+##    - collector returned by 'get_collector' receives events of each file in worker process
+##    - partial results of collectors are passed to 'add_result' in main process in order of files,
+##      then 'emit' writes the report
+## 'get_collector' has to return picklable callable creating collector (sink itself is not sent to workers)
+class ReportSink(ABC):
+    @abstractmethod
+    def get_collector(self):
+        pass
+
+    @abstractmethod
+    def add_result(self, data_path, result):
+        pass
+
+    @abstractmethod
+    def emit(self):
+        pass
+
+
+# =============================================================================
+
+
+class SourceCollector(EventCollector):
+    def __init__(self):
+        self.interner = get_interner()
+        self.ids_dict: Dict[int, Data] = {}
+
+    def add_event(self, event):
+        if event.get("name") != "Source":
+            return
+        event_data = get_data_id(event, self.interner)
+        if not event_data:
+            return
+        add_data(self.ids_dict, event_data)
+
+    def result(self, data_path, complete):
+        if not complete:
+            ## the same as 'read_source_data'
+            return {}
+        return {self.interner.get_path(path_id): item_data for path_id, item_data in self.ids_dict.items()}
+
+
+## summary of 'Source' events (the same as 'analyze' tool)
+class SourceSink(ReportSink):
+    def __init__(self, exclude_list, out_file_path):
+        self.exclude_filter = ExcludeItemFilter(exclude_list)
+        self.out_file_path = out_file_path
+        self.interner = get_interner()
+        ## indexed by ids of paths
+        self.merged_dict: Dict[int, Data] = {}
+
+    def get_collector(self):
+        return SourceCollector
+
+    def add_result(self, data_path, result):
+        merge_data(self.merged_dict, result, self.exclude_filter, self.interner)
+
+    def emit(self):
+        data_dict = sort_data(self.merged_dict, self.interner)
+        _LOGGER.info("writing analyze report to %s", self.out_file_path)
+        with open(self.out_file_path, "w", encoding="utf-8") as out_file:
+            pprint.pprint(data_dict, out_file, indent=4, sort_dicts=False)
+        return data_dict
+
+
+# =============================================================================
+
+
+class FlameCollector(EventCollector):
+    def __init__(self, prune: PruneOptions = None):
+        self.prune = prune
+        self.top_store = ThreadStores()
+        ## summary events are not partitioned by thread (see 'read_flame_blocks')
+        self.bottom_store = EventStore()
+
+    def add_event(self, event):
+        if event["ph"] != "X":
+            return
+        if not is_bottom_event(event):
+            self.top_store.add_event(event)
+        else:
+            self.bottom_store.add_event(event)
+
+    ## flame graph is rendered in worker process, result is path to SVG file or None
+    def result(self, data_path, complete):
+        blocks, bblocks = get_flame_blocks(self.top_store, self.bottom_store, self.prune)
+        if not blocks and not bblocks:
+            _LOGGER.warning("unable to get trace events from file: %s", data_path)
+            return None
+        out_svg_path = f"{data_path}.svg"
+        render_flamegraph(blocks, bblocks, out_svg_path)
+        return out_svg_path
+
+
+## flame graphs next to trace files (the same as 'flamegraphs' tool)
+class FlameSink(ReportSink):
+    def __init__(self, prune: PruneOptions = None):
+        self.prune = prune
+        self.svg_list: List[str] = []
+
+    def get_collector(self):
+        return functools.partial(FlameCollector, self.prune)
+
+    def add_result(self, data_path, result):
+        if result:
+            self.svg_list.append(result)
+
+    def emit(self):
+        _LOGGER.info("flame graphs written: %s", len(self.svg_list))
+        return self.svg_list
+
+
+# =============================================================================
+
+
+class CallgrindCollector(EventCollector):
+    def __init__(self):
+        self.top_store = ThreadStores()
+
+    def add_event(self, event):
+        if event["ph"] != "X":
+            return
+        if not is_bottom_event(event):
+            self.top_store.add_event(event)
+
+    def result(self, data_path, complete):
+        return pack_store_entries(self.top_store, data_path)
+
+
+## callgrind file of all traces (the same as 'callgrind' tool, but without launching viewer)
+## entries are written to file as soon as they are received (or at the end if 'merge' is set)
+class CallgrindSink(ReportSink):
+    def __init__(self, out_callgrind_path, merge=False):
+        self.out_callgrind_path = out_callgrind_path
+        self.merged: MergedEntries = MergedEntries() if merge else None
+        self.out_file = None
+        self.writer: CallgrindWriter = None
+
+    def get_collector(self):
+        return CallgrindCollector
+
+    def add_result(self, data_path, result):
+        if self.merged is not None:
+            self.merged.add_packed(result)
+            return
+        self._open()
+        self.writer.write_packed(result)
+
+    def emit(self):
+        _LOGGER.info("writing callgrind report to %s", self.out_callgrind_path)
+        self._open()
+        if self.merged is not None:
+            self.merged.write(self.writer)
+        self.writer.write_footer()
+        self.out_file.close()
+        self.out_file = None
+        return self.out_callgrind_path
+
+    def _open(self):
+        if self.out_file is not None:
+            return
+        self.out_file = open_callgrind_file(self.out_callgrind_path)
+        self.writer = CallgrindWriter(self.out_file)
+        self.writer.write_header()
+
+
+# =============================================================================
+
+
+## parse trace file once and pass its events to collectors created by given factories
+## returns list of partial results of collectors
+def read_reports(data_path, collector_types):
+    collectors = [collector_type() for collector_type in collector_types]
+    complete = True
+    try:
+        for event in iter_events(data_path):
+            for collector in collectors:
+                collector.add_event(event)
+    except json.decoder.JSONDecodeError as exc:
+        _LOGGER.warning("malformed trace events in %s: %s", data_path, exc)
+        complete = False
+    return [collector.result(data_path, complete) for collector in collectors]
+
+
+## generate reports of given sinks reading each file only once
+## returns list of values returned by 'emit' of sinks
+def generate_reports(files_list, sinks_list: List[ReportSink], jobs=1):
+    collector_types = [sink.get_collector() for sink in sinks_list]
+    reader = functools.partial(read_reports, collector_types=collector_types)
+    files_len = len(files_list)
+    for idx, results_list in enumerate(map_items(reader, files_list, jobs)):
+        data_path = files_list[idx]
+        _LOGGER.info("%s/%s: reading reports of %s", idx, files_len, data_path)
+        for sink, result in zip(sinks_list, results_list):
+            sink.add_result(data_path, result)
+    return [sink.emit() for sink in sinks_list]
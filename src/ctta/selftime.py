@@ -0,0 +1,140 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import json
+from typing import Dict
+from dataclasses import dataclass, field
+
+from ctta.analyzer import ExcludeItemFilter
+from ctta.eventstore import EventStore, ThreadStores
+from ctta.numpystats import to_number
+from ctta.pathintern import get_interner
+from ctta.pool import map_items
+from ctta.cache import CachedReader
+from ctta.tracereader import iter_events
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## inclusive and self time of header
+@dataclass
+class SelfData:
+    dur: int = 0  # inclusive duration given in microseconds (10^-6 s)
+    self_dur: int = 0  # duration without nested includes
+    count: int = 0
+    parent: str = None  # header that most often included the header (None means main source file)
+    parents: Dict[str, int] = field(default_factory=dict, repr=False)  # number of includes by each parent
+
+    ## average self duration (used for sorting)
+    def avg(self):
+        return float(self.self_dur) / self.count
+
+    def total_avg(self):
+        return float(self.dur) / self.count
+
+    def update_parent(self):
+        self.parent = None
+        max_count = 0
+        for parent, count in self.parents.items():
+            if count > max_count:
+                self.parent = parent
+                max_count = count
+
+
+## analyze 'Source' events with attribution of time of nested headers
+## results are sorted by average self time
+def analyze_self(files_list, exclude_list, jobs=1, cache=None) -> Dict[str, SelfData]:
+    exclude_filter = ExcludeItemFilter(exclude_list)
+    _LOGGER.info("exclude list: %s", exclude_filter.raw_exclude)
+
+    merged_dict: Dict[str, SelfData] = {}
+    reader = CachedReader(read_source_self_data, "source-self", cache)
+    for file_dict in map_items(reader, files_list, jobs):
+        merge_self_data(merged_dict, file_dict, exclude_filter)
+
+    for item_data in merged_dict.values():
+        item_data.update_parent()
+    return dict(sorted(merged_dict.items(), key=lambda item: item[1].avg()))
+
+
+## returns dict with inclusive and self time of 'Source' events of given file (before applying exclude filter)
+## events of each thread are nested separately
+def read_source_self_data(data_path):
+    thread_stores = ThreadStores()
+    try:
+        for event in iter_events(data_path):
+            if event.get("name") != "Source":
+                continue
+            if not event.get("args"):
+                continue
+            thread_stores.add_event(event)
+    except json.decoder.JSONDecodeError:
+        return {}
+
+    file_dict: Dict[str, SelfData] = {}
+    for event_store in thread_stores.get_stores():
+        try:
+            add_store_self_data(file_dict, event_store)
+        except RuntimeError:
+            _LOGGER.warning("unable to nest 'Source' events of file: %s", data_path)
+            return {}
+
+    for item_data in file_dict.values():
+        item_data.dur = to_number(item_data.dur)
+        item_data.self_dur = to_number(item_data.self_dur)
+    return file_dict
+
+
+## add data of 'Source' events of single thread to 'file_dict'
+def add_store_self_data(file_dict: Dict[str, SelfData], event_store: EventStore):
+    children_dur = event_store.get_children_durations()
+
+    interner = get_interner()
+    ## normalized path of each label
+    labels_paths: Dict[int, str] = {}
+    events_paths = []
+    for label_id in event_store.label_id:
+        path = labels_paths.get(label_id)
+        if path is None:
+            path = interner.normalize(event_store.names[label_id])
+            labels_paths[label_id] = path
+        events_paths.append(path)
+
+    for idx, path in enumerate(events_paths):
+        item_data = file_dict.get(path)
+        if item_data is None:
+            item_data = SelfData()
+            file_dict[path] = item_data
+        dur = event_store.dur[idx]
+        item_data.dur += dur
+        item_data.self_dur += dur - children_dur[idx]
+        item_data.count += 1
+        parent = event_store.parent[idx]
+        parent_path = events_paths[parent] if parent >= 0 else None
+        item_data.parents[parent_path] = item_data.parents.get(parent_path, 0) + 1
+
+
+## merge partial result of 'read_source_self_data' into 'merged_dict'
+def merge_self_data(merged_dict, file_dict, exclude_filter=None):
+    for file, file_data in file_dict.items():
+        if exclude_filter is not None and exclude_filter.excluded(file):
+            continue
+        item_data = merged_dict.get(file)
+        if item_data is None:
+            item_data = SelfData()
+            merged_dict[file] = item_data
+        item_data.dur += file_data.dur
+        item_data.self_dur += file_data.self_dur
+        item_data.count += file_data.count
+        for parent, count in file_data.parents.items():
+            item_data.parents[parent] = item_data.parents.get(parent, 0) + count
@@ -0,0 +1,246 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import re
+import json
+import codecs
+import mmap
+from typing import Dict, Any, Iterator
+
+from ctta.jsonbackend import resolve_backend, load_file, map_file
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+CHUNK_SIZE = 1024 * 1024
+
+## max size of buffered content of single value (bigger content is treated as malformed)
+MAX_BUFFER_SIZE = 64 * CHUNK_SIZE
+
+WHITESPACE_REGEX = re.compile(r"[ \t\n\r]*")
+
+WHITESPACE_BYTES_REGEX = re.compile(rb"[ \t\n\r]*")
+STRING_BYTES_REGEX = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+## tokens needed to skip JSON value: strings, brackets and commas (lone quote means unterminated string)
+VALUE_TOKEN_BYTES_REGEX = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|"|[\[\]{},]')
+
+TRACE_EVENTS_KEY = b'"traceEvents"'
+
+
+## yields trace events one by one
+## 'backend' is name of JSON parser (see 'ctta.jsonbackend'), if None then default backend is used
+## streaming backend does not load whole file into memory
+## raises 'json.decoder.JSONDecodeError' on malformed content
+def iter_events(trace_file_path, backend=None) -> Iterator[Dict[str, Any]]:
+    backend = resolve_backend(backend, os.path.getsize(trace_file_path))
+    if backend != "stream":
+        dict_data = load_file(trace_file_path, backend)
+        if not isinstance(dict_data, dict):
+            return
+        events_list = dict_data.get("traceEvents")
+        if not events_list:
+            return
+        yield from events_list
+        return
+
+    with open(trace_file_path, "rb") as data_file:
+        data_map = map_file(data_file)
+        if data_map is None:
+            return
+        with data_map:
+            ## events list is searched directly in mapped pages
+            events_pos = find_events_list(data_map)
+            if events_pos < 0:
+                return
+            if hasattr(data_map, "madvise"):
+                data_map.madvise(mmap.MADV_SEQUENTIAL)
+            data_map.seek(events_pos)
+            reader = EventStreamReader(data_map, list_found=True)
+            yield from reader.events()
+
+
+## returns position after opening bracket of events list in given bytes-like buffer
+## returns -1 if buffer does not contain events list
+## only keys of top level dict are checked (values of other keys are skipped)
+## if 'final' is False then None is returned when buffer ends before events list is found
+## raises 'json.decoder.JSONDecodeError' on malformed content
+def find_events_list(data_buffer, final=True):
+    events_pos = scan_events_list(data_buffer)
+    if events_pos is not None or not final:
+        return events_pos
+    if skip_whitespace(data_buffer, 0) >= len(data_buffer):
+        ## empty content
+        return -1
+    raise json.decoder.JSONDecodeError("unterminated object", "", len(data_buffer))
+
+
+## returns None if buffer ends before events list is found
+def scan_events_list(data_buffer):
+    buffer_len = len(data_buffer)
+    pos = skip_whitespace(data_buffer, 0)
+    if pos >= buffer_len:
+        return None
+    if data_buffer[pos : pos + 1] != b"{":
+        ## not dict
+        return -1
+    pos += 1
+    while True:
+        pos = skip_whitespace(data_buffer, pos)
+        if pos >= buffer_len:
+            return None
+        if data_buffer[pos : pos + 1] == b"}":
+            return -1
+        key_found = STRING_BYTES_REGEX.match(data_buffer, pos)
+        if key_found is None:
+            if data_buffer[pos : pos + 1] == b'"':
+                ## key splitted
+                return None
+            raise json.decoder.JSONDecodeError("expecting property name", "", pos)
+        pos = skip_whitespace(data_buffer, key_found.end())
+        if pos >= buffer_len:
+            return None
+        if data_buffer[pos : pos + 1] != b":":
+            raise json.decoder.JSONDecodeError("expecting ':' delimiter", "", pos)
+        pos = skip_whitespace(data_buffer, pos + 1)
+        if pos >= buffer_len:
+            return None
+        if key_found.group() == TRACE_EVENTS_KEY:
+            if data_buffer[pos : pos + 1] != b"[":
+                ## not list
+                return -1
+            return pos + 1
+        pos = skip_value(data_buffer, pos)
+        if pos is None:
+            return None
+        pos = skip_whitespace(data_buffer, pos)
+        if pos >= buffer_len:
+            return None
+        next_char = data_buffer[pos : pos + 1]
+        if next_char == b"}":
+            return -1
+        if next_char != b",":
+            raise json.decoder.JSONDecodeError("expecting ',' delimiter", "", pos)
+        pos += 1
+
+
+## returns position after JSON value starting at given position (value is not decoded)
+## returns None if buffer ends before end of value
+def skip_value(data_buffer, pos):
+    depth = 0
+    for found in VALUE_TOKEN_BYTES_REGEX.finditer(data_buffer, pos):
+        token = found.group()
+        if token == b'"':
+            return None
+        if token in (b"[", b"{"):
+            depth += 1
+        elif token in (b"]", b"}"):
+            if depth == 0:
+                ## scalar value followed by end of dict
+                return found.start()
+            depth -= 1
+            if depth == 0:
+                return found.end()
+        elif token == b",":
+            if depth == 0:
+                return found.start()
+        elif depth == 0:
+            ## string value
+            return found.end()
+    return None
+
+
+def skip_whitespace(data_buffer, pos):
+    return WHITESPACE_BYTES_REGEX.match(data_buffer, pos).end()
+
+
+## incremental reader of 'traceEvents' list
+## events are decoded directly from file buffer, only one chunk of file is kept in memory
+## 'list_found' means that 'data_file' is already positioned after opening bracket of events list
+class EventStreamReader:
+    def __init__(self, data_file, chunk_size=CHUNK_SIZE, list_found=False, max_buffer_size=MAX_BUFFER_SIZE):
+        self._file = data_file
+        self._list_found = list_found
+        self._chunk_size = chunk_size
+        self._max_buffer_size = max_buffer_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def events(self):
+        if not self._list_found and not self._find_events_list():
+            return
+        while True:
+            self._skip_whitespace()
+            if self._pos >= len(self._buffer):
+                if not self._read_chunk():
+                    raise json.decoder.JSONDecodeError("unterminated events list", self._buffer, self._pos)
+                continue
+            next_char = self._buffer[self._pos]
+            if next_char == "]":
+                return
+            if next_char == ",":
+                self._pos += 1
+                continue
+            yield self._decode_value()
+
+    ## moves position after opening bracket of events list
+    ## returns False if given file does not contain events list
+    def _find_events_list(self):
+        raw_data = b""
+        while True:
+            data = self._file.read(self._chunk_size)
+            raw_data += data
+            events_pos = find_events_list(raw_data, final=not data)
+            if events_pos is not None:
+                break
+            if len(raw_data) > self._max_buffer_size:
+                raise json.decoder.JSONDecodeError("events list not found within size limit", "", len(raw_data))
+        if events_pos < 0:
+            return False
+        self._buffer = self._decoder.decode(raw_data[events_pos:])
+        self._pos = 0
+        return True
+
+    def _decode_value(self):
+        while True:
+            try:
+                value, end_pos = self._json_decoder.raw_decode(self._buffer, self._pos)
+                self._pos = end_pos
+                return value
+            except json.decoder.JSONDecodeError as exc:
+                if len(self._buffer) - self._pos > self._max_buffer_size:
+                    ## malformed content would be buffered until end of file
+                    raise json.decoder.JSONDecodeError("value exceeds size limit", self._buffer, self._pos) from exc
+                ## value can be splitted between chunks
+                if not self._read_chunk():
+                    raise
+
+    def _skip_whitespace(self):
+        self._pos = WHITESPACE_REGEX.match(self._buffer, self._pos).end()
+
+    def _read_chunk(self):
+        if self._eof:
+            return False
+        data = self._file.read(self._chunk_size)
+        if not data:
+            self._eof = True
+            self._buffer += self._decoder.decode(b"", final=True)
+            return False
+        if self._pos > 0:
+            ## drop already consumed data
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        self._buffer += self._decoder.decode(data)
+        return True
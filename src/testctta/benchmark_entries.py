@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Measure conversion of EventTree and EventStore to callgrind entries on synthetic events
+## (compared with previous implementation of EventTree conversion).
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import logging
+import time
+import argparse
+
+from ctta.eventree import EventTree
+from ctta.eventstore import EventStore
+from ctta.analyzer import get_entries_from_event_tree, get_entries_from_store, get_entry_name, pack_entries
+from ctta.callgrind import Entry
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## copy of previous implementation (entries of children are looked up by tree items)
+def legacy_get_entries(event_tree, data_file_path):
+    entries_list = []
+    entries_dict = {}
+
+    for item in event_tree.iter_children():
+        entry = entries_dict.get(item)
+        if entry is None:
+            entry = legacy_get_entry(item, data_file_path)
+            entries_dict[item] = entry
+            entries_list.append(entry)
+
+        for child_item in item.children:
+            child_entry = entries_dict.get(child_item)
+            if child_entry is None:
+                child_entry = legacy_get_entry(child_item, data_file_path)
+                entries_dict[child_item] = child_entry
+                entries_list.append(child_entry)
+            entry.calls.append(child_entry)
+
+    return entries_list
+
+
+def legacy_get_entry(item, data_file_path):
+    event = item.event_data
+
+    args = event.get("args", {})
+    event_name = args.get("detail")
+    if event_name is None:
+        event_name = event.get("name")
+
+    code = get_entry_name(event_name, data_file_path)
+
+    children_dur = 0
+    for child in item.children:
+        child_event = child.event_data
+        children_dur += float(child_event["dur"])
+
+    duration = float(event["dur"]) / 1000000  # convert to seconds
+    children_dur = float(children_dur) / 1000000  # convert to seconds
+    self_dur = duration - children_dur
+    entry = Entry(code, 1, 1, self_dur, duration, [])
+
+    return entry
+
+
+## blocks of 10 events: parent with 3 children, each child with 2 children
+def generate_events(events_num):
+    events_list = []
+    for block in range(events_num // 10):
+        block_start = block * 100
+        events_list.append({"name": "Frontend", "ts": block_start, "dur": 99})
+        for child in range(3):
+            child_start = block_start + 1 + child * 33
+            detail = f"/proj/header{(block + child) % 1000}.h"
+            events_list.append({"name": "Source", "ts": child_start, "dur": 30, "args": {"detail": detail}})
+            for subchild in range(2):
+                subchild_start = child_start + 1 + subchild * 14
+                detail = f"ns::func{(block + subchild) % 100}<int>"
+                events_list.append(
+                    {"name": "InstantiateFunction", "ts": subchild_start, "dur": 10, "args": {"detail": detail}}
+                )
+    return events_list
+
+
+def measure(converter, events_data):
+    start_time = time.perf_counter()
+    entries_list = converter(events_data, "file.cpp")
+    return time.perf_counter() - start_time, entries_list
+
+
+def entry_key(entry):
+    return (entry.code, entry.inlinetime, entry.totaltime, tuple(child.code for child in entry.calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EventTree and EventStore to callgrind entries benchmark")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10**4, 10**5, 10**6], help="Events numbers")
+    args = parser.parse_args()
+
+    for events_num in args.sizes:
+        events_list = generate_events(events_num)
+        event_tree = EventTree()
+        event_tree.add_events(events_list)
+        event_store = EventStore()
+        event_store.add_events(events_list)
+        legacy_time, legacy_entries = measure(legacy_get_entries, event_tree)
+        tree_time, tree_entries = measure(get_entries_from_event_tree, event_tree)
+        store_time, store_entries = measure(get_entries_from_store, event_store)
+        ## order of legacy entries differs
+        same_legacy = sorted(map(entry_key, legacy_entries)) == sorted(map(entry_key, tree_entries))
+        ## both are in pre-order
+        tree_packed = pack_entries(tree_entries)
+        same_store = tree_packed == pack_entries(store_entries)
+        print(
+            f"{events_num:>8} events: event tree {tree_time:8.3f}s legacy {legacy_time:8.3f}s"
+            f" event store {store_time:8.3f}s entries: {len(tree_packed)}"
+            f" same as legacy: {same_legacy} same as store: {same_store}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Measure scaling of EventTree building on synthetic events.
+## Legacy (linear scan) implementation is measured only for small inputs.
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import logging
+import time
+import random
+import argparse
+
+from ctta.eventree import EventTree
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## copy of previous implementation with linear scans
+class LegacyItem:
+    def __init__(self, event_data=None):
+        self.children = []
+        self.level = -1
+        self.event_data = event_data
+        if event_data is not None:
+            self._start = event_data["ts"]
+            self._end = event_data["ts"] + event_data["dur"]
+
+    def start(self):
+        return self._start
+
+    def end(self):
+        return self._end
+
+    def set_level(self, new_level):
+        self.level = new_level
+        for item in self.children:
+            item.set_level(new_level + 1)
+
+    def add_item(self, item):
+        if not self.children:
+            self._insert(len(self.children), item)
+            return
+        self._add_cover(item)
+        self._add_side(item)
+
+    def _add_cover(self, item):
+        item_start = item.start()
+        item_end = item.end()
+        if item_end < self.children[0].start() or item_start > self.children[-1].end():
+            return
+        idx = 0
+        while idx < len(self.children):
+            child = self.children[idx]
+            if item_start <= child.start():
+                if item_end >= child.end():
+                    del self.children[idx]
+                    item.add_item(child)
+                else:
+                    if item_end < child.start():
+                        break
+                    idx += 1
+            else:
+                idx += 1
+
+    def _add_side(self, item):
+        if not self.children:
+            self._insert(0, item)
+            return
+        item_start = item.start()
+        item_end = item.end()
+        if item_end < self.children[0].start():
+            self._insert(0, item)
+            return
+        if item_start > self.children[-1].end():
+            self._insert(len(self.children), item)
+            return
+        for idx, child in enumerate(self.children):
+            if item_end <= child.end():
+                if item_start >= child.start():
+                    child.add_item(item)
+                    return
+                if item_end <= child.start():
+                    self._insert(idx, item)
+                    return
+                raise RuntimeError("invalid case")
+            if item_start <= child.start() or item_start < child.end():
+                raise RuntimeError("invalid case")
+        self._insert(len(self.children), item)
+
+    def _insert(self, index, item):
+        self.children.insert(index, item)
+        item.set_level(self.level + 1)
+
+
+def build_legacy(events_list):
+    root = LegacyItem()
+    for event in events_list:
+        root.add_item(LegacyItem(event))
+    return root
+
+
+def build_tree(events_list):
+    tree = EventTree()
+    tree.add_events(events_list, engine="incremental")
+    return tree
+
+
+def build_bulk(events_list):
+    tree = EventTree()
+    tree.add_events(events_list, engine="bulk")
+    return tree
+
+
+## events in order of trace file - child is written before its parent
+def generate_nested_pairs(events_num):
+    events_list = []
+    for idx in range(events_num // 2):
+        events_list.append({"ts": idx * 10 + 1, "dur": 5})
+        events_list.append({"ts": idx * 10, "dur": 8})
+    return events_list
+
+
+def generate_shuffled_siblings(events_num):
+    events_list = [{"ts": idx * 10, "dur": 8} for idx in range(events_num)]
+    random.Random(events_num).shuffle(events_list)
+    return events_list
+
+
+def measure(builder, events_list):
+    start_time = time.perf_counter()
+    builder(events_list)
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EventTree benchmark")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10**4, 10**5, 10**6], help="Events numbers")
+    parser.add_argument("--legacy-limit", type=int, default=2 * 10**4, help="Max events number for legacy builder")
+    args = parser.parse_args()
+
+    generators = [generate_nested_pairs, generate_shuffled_siblings]
+    for generator in generators:
+        print(f"{generator.__name__}:")
+        for events_num in args.sizes:
+            events_list = generator(events_num)
+            tree_time = measure(build_tree, events_list)
+            bulk_time = measure(build_bulk, events_list)
+            message = f"    {events_num:>8} events: bulk {bulk_time:8.3f}s bisect {tree_time:8.3f}s"
+            if events_num <= args.legacy_limit:
+                legacy_time = measure(build_legacy, events_list)
+                message += f" legacy {legacy_time:8.3f}s"
+            print(message)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Compare parsing time of available JSON backends.
+##
+## usage: benchmark_json.py [--events N] [--repeat N] [trace.json ...]
+## when no file is given then synthetic trace is generated.
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import logging
+import time
+import tempfile
+import argparse
+
+from ctta.jsonbackend import get_available_backends, resolve_backend
+from ctta.tracereader import iter_events
+
+from testctta.benchmark_reader import generate_trace
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def measure(file_path, backend, repeat):
+    best_time = None
+    counter = 0
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        counter = 0
+        for event in iter_events(file_path, backend):
+            if event.get("name") == "Source":
+                counter += 1
+        duration = time.perf_counter() - start_time
+        if best_time is None or duration < best_time:
+            best_time = duration
+    return counter, best_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON backends benchmark")
+    parser.add_argument("--events", type=int, default=500000, help="Number of events of synthetic trace")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of repetitions (best time is reported)")
+    parser.add_argument("files", nargs="*", default=[], help="Trace files")
+    args = parser.parse_args()
+
+    backends_list = get_available_backends()
+    print(f"available backends: {backends_list}")
+
+    files_list = args.files
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if not files_list:
+            trace_path = os.path.join(temp_dir, "trace.json")
+            generate_trace(trace_path, args.events)
+            files_list = [trace_path]
+
+        for file_path in files_list:
+            file_size = os.path.getsize(file_path)
+            print(f"{file_path} ({file_size / 1024 / 1024:.1f} MB):")
+            for backend in backends_list:
+                counter, duration = measure(file_path, backend, args.repeat)
+                name = backend
+                if backend == "auto":
+                    name = f"auto ({resolve_backend(backend, file_size)})"
+                print(f"    {name:16} items: {counter:>8} time: {duration:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
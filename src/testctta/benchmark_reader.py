@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+##
+## Compare peak memory of trace loaders and events trees.
+## Each loader is executed in separate process, so peak RSS is not affected by other loaders.
+##
+## usage: benchmark_reader.py [--events N] [trace.json ...]
+## when no file is given then synthetic trace is generated.
+##
+
+try:
+    ## following import success only when file is directly executed from command line
+    ## otherwise will throw exception when executing as parameter for "python -m"
+    # pylint: disable=W0611
+    import __init__
+except ImportError:
+    ## when import fails then it means that the script was executed indirectly
+    ## in this case __init__ is already loaded
+    pass
+
+import os
+import sys
+import logging
+import json
+import time
+import resource
+import tempfile
+import multiprocessing
+import argparse
+
+from ctta.analyzer import read_events, read_complete_events
+from ctta.tracereader import iter_events
+from ctta.eventree import EventTree
+from ctta.eventstore import EventStore
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def generate_trace(out_path, events_num):
+    with open(out_path, "w", encoding="utf-8") as out_file:
+        out_file.write('{"traceEvents": [\n')
+        for idx in range(events_num):
+            if idx > 0:
+                out_file.write(",\n")
+            event = {
+                "pid": 1,
+                "tid": 0,
+                "ph": "X",
+                "ts": idx * 10,
+                "dur": 5,
+                "name": "Source" if idx % 2 else "InstantiateFunction",
+                "args": {"detail": f"/usr/include/some/path/to/header_{idx % 1000}.h"},
+            }
+            json.dump(event, out_file)
+        out_file.write('\n], "beginningOfTime": 0}\n')
+
+
+def load_nothing(_file_path):
+    return 0
+
+
+def load_full(file_path):
+    events_list = read_events(file_path)
+    counter = 0
+    for event in events_list:
+        if event.get("name") == "Source":
+            counter += 1
+    return counter
+
+
+def load_stream(file_path):
+    counter = 0
+    for event in iter_events(file_path):
+        if event.get("name") == "Source":
+            counter += 1
+    return counter
+
+
+def load_tree(file_path):
+    event_tree = EventTree()
+    event_tree.add_events(list(read_complete_events(file_path)))
+    return len(event_tree.get_children())
+
+
+def load_store(file_path):
+    event_store = EventStore()
+    event_store.add_events(read_complete_events(file_path))
+    event_store.nest()
+    return len(event_store)
+
+
+def measure(loader, file_path):
+    start_time = time.perf_counter()
+    counter = loader(file_path)
+    duration = time.perf_counter() - start_time
+    ## on Linux 'ru_maxrss' is given in kilobytes
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return counter, duration, peak_rss
+
+
+def run_isolated(loader, file_path):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(measure, (loader, file_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="trace loaders benchmark")
+    parser.add_argument("--events", type=int, default=1000000, help="Number of events of synthetic trace")
+    parser.add_argument("files", nargs="*", default=[], help="Trace files")
+    args = parser.parse_args()
+
+    files_list = args.files
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if not files_list:
+            trace_path = os.path.join(temp_dir, "trace.json")
+            generate_trace(trace_path, args.events)
+            files_list = [trace_path]
+
+        base_rss = run_isolated(load_nothing, "")[2]
+        print(f"baseline process RSS: {base_rss / 1024:.1f} MB")
+        for file_path in files_list:
+            file_size = os.path.getsize(file_path) / 1024 / 1024
+            print(f"{file_path} ({file_size:.1f} MB):")
+            for loader in [load_full, load_stream, load_tree, load_store]:
+                counter, duration, peak_rss = run_isolated(loader, file_path)
+                print(
+                    f"    {loader.__name__:12} items: {counter:>8} time: {duration:.2f}s peak RSS: {peak_rss / 1024:.1f} MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import json
+import tempfile
+import unittest
+
+from ctta.analyzer import analyze, read_callgrind_enries, pack_entries, unpack_entries
+from ctta.analyzer import get_blocks_from_tree, get_flame_blocks, prune_preorder, read_flame_blocks
+from ctta.eventree import EventTree
+from ctta.eventstore import EventStore
+from ctta.flamegraph import PruneOptions
+
+
+def source_event(ts, dur, detail):
+    return {"pid": 1, "tid": 0, "ph": "X", "ts": ts, "dur": dur, "name": "Source", "args": {"detail": detail}}
+
+
+def write_trace(dir_path, file_name, events_list):
+    file_path = os.path.join(dir_path, file_name)
+    with open(file_path, "w", encoding="utf-8") as out_file:
+        json.dump({"traceEvents": events_list}, out_file)
+    return file_path
+
+
+class AnalyzeTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.files_list = [
+            write_trace(
+                root,
+                "aaa.json",
+                [
+                    source_event(0, 100, "/usr/include/vector"),
+                    source_event(10, 50, "/proj/a.h"),
+                    source_event(200, 30, "/proj/./b.h"),
+                ],
+            ),
+            write_trace(root, "bbb.json", [source_event(0, 40, "/proj/b.h"), source_event(50, 20, "/proj/c.h")]),
+            write_trace(root, "ccc.json", []),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_analyze(self):
+        data_dict = analyze(self.files_list, ["/usr/*"])
+        self.assertEqual(list(data_dict.keys()), ["/proj/c.h", "/proj/b.h", "/proj/a.h"])
+        self.assertEqual(data_dict["/proj/b.h"].dur, 70)
+        self.assertEqual(data_dict["/proj/b.h"].count, 2)
+
+    def test_analyze_jobs(self):
+        serial_dict = analyze(self.files_list, ["/usr/*"])
+        parallel_dict = analyze(self.files_list, ["/usr/*"], jobs=2)
+        self.assertEqual(list(serial_dict.items()), list(parallel_dict.items()))
+
+
+class PackEntriesTest(unittest.TestCase):
+    def test_pack_unpack(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            events_list = [
+                {"ph": "X", "ts": 0, "dur": 100, "name": "ExecuteCompiler"},
+                {"ph": "X", "ts": 10, "dur": 50, "name": "Frontend"},
+                {"ph": "X", "ts": 20, "dur": 10, "name": "Source", "args": {"detail": "a.h"}},
+            ]
+            file_path = write_trace(temp_dir, "aaa.json", events_list)
+            entries = read_callgrind_enries(file_path)
+
+        unpacked = unpack_entries(pack_entries(entries))
+        self.assertEqual(len(unpacked), len(entries))
+        for entry, other in zip(entries, unpacked):
+            self.assertEqual(entry.code, other.code)
+            self.assertEqual(entry.totaltime, other.totaltime)
+            self.assertEqual([item.code for item in entry.calls], [item.code for item in other.calls])
+
+
+def complete_event(ts, dur, name):
+    return {"pid": 1, "tid": 0, "ph": "X", "ts": ts, "dur": dur, "name": name}
+
+
+## summary events as written by clang -- each "Total" event has its own tid
+def clang_trace_events():
+    return [
+        complete_event(0, 100, "ExecuteCompiler"),
+        complete_event(0, 60, "Frontend"),
+        {"pid": 1, "tid": 1, "ph": "X", "ts": 0, "dur": 60, "name": "Total ExecuteCompiler"},
+        {"pid": 1, "tid": 2, "ph": "X", "ts": 0, "dur": 40, "name": "Total Frontend"},
+        {"pid": 1, "tid": 3, "ph": "X", "ts": 0, "dur": 30, "name": "Total Source"},
+    ]
+
+
+class FlameBlocksTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_total_events(self):
+        file_path = write_trace(self.temp_dir.name, "clang.json", clang_trace_events())
+        blocks, bblocks = read_flame_blocks(file_path)
+        self.assertEqual([(block.name, block.level) for block in blocks], [("ExecuteCompiler", 0), ("Frontend", 1)])
+        ## summary events are nested in single lane
+        self.assertEqual(
+            [(block.name, block.w, block.level) for block in bblocks],
+            [("Total ExecuteCompiler", 60, 0), ("Total Frontend", 40, 1), ("Total Source", 30, 2)],
+        )
+
+
+class PruneBlocksTest(unittest.TestCase):
+    def setUp(self):
+        self.events_list = [
+            complete_event(0, 1000, "root"),
+            complete_event(0, 400, "big"),
+            complete_event(0, 300, "big_child"),
+            complete_event(0, 5, "tiny_grandchild"),
+            complete_event(400, 5, "small_1"),
+            complete_event(401, 1, "small_1_child"),
+            complete_event(410, 5, "small_2"),
+            complete_event(500, 200, "big_2"),
+            complete_event(900, 2, "small_3"),
+        ]
+
+    def get_names(self, min_dur=0, max_depth=0, merge_small=False):
+        event_store = EventStore()
+        event_store.add_events(self.events_list)
+        store_blocks = get_blocks_from_tree(event_store, 0, min_dur, max_depth, merge_small)
+        event_tree = EventTree()
+        event_tree.add_events(self.events_list)
+        tree_blocks = get_blocks_from_tree(event_tree, 0, min_dur, max_depth, merge_small)
+        self.assertEqual(store_blocks, tree_blocks)
+        return [(block.full_name, block.x, block.w, block.level) for block in store_blocks]
+
+    def test_no_prune(self):
+        self.assertEqual(len(self.get_names()), len(self.events_list))
+
+    def test_min_dur(self):
+        names_list = self.get_names(min_dur=10)
+        self.assertEqual(
+            names_list,
+            [("root", 0, 1000, 0), ("big", 0, 400, 1), ("big_child", 0, 300, 2), ("big_2", 500, 200, 1)],
+        )
+
+    def test_merge_small(self):
+        names_list = self.get_names(min_dur=10, merge_small=True)
+        self.assertEqual(
+            names_list,
+            [
+                ("root", 0, 1000, 0),
+                ("big", 0, 400, 1),
+                ("big_child", 0, 300, 2),
+                ("other (2 items)", 400, 15, 1),
+                ("big_2", 500, 200, 1),
+            ],
+        )
+
+    def test_max_depth(self):
+        names_list = self.get_names(max_depth=2, min_dur=3, merge_small=True)
+        self.assertEqual(
+            names_list,
+            [
+                ("root", 0, 1000, 0),
+                ("big", 0, 400, 1),
+                ("small_1", 400, 5, 1),
+                ("small_2", 410, 5, 1),
+                ("big_2", 500, 200, 1),
+            ],
+        )
+
+    def test_preorder(self):
+        levels = [0, 1, 1, 1, 0]
+        items_list = list(prune_preorder([0, 0, 2, 4, 10], [10, 2, 2, 2, 10], levels, min_dur=5, merge_small=True))
+        self.assertEqual(items_list, [(0, 0, 10, 0, 1), (None, 0, 6, 1, 3), (4, 10, 10, 0, 1)])
+
+    def test_min_width(self):
+        event_store = EventStore()
+        event_store.add_events(self.events_list)
+        prune = PruneOptions(min_width=6)
+        ## 1000 us on 1200 pixels
+        self.assertEqual(prune.get_min_dur(1000), 5.0)
+        ## lists are swapped if there is no bottom blocks
+        empty_blocks, top_blocks = get_flame_blocks(event_store, EventStore(), prune)
+        self.assertEqual(empty_blocks, [])
+        self.assertEqual(
+            [block.full_name for block in top_blocks],
+            ["root", "big", "big_child", "tiny_grandchild", "small_1", "small_2", "big_2"],
+        )
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import tempfile
+import unittest
+
+from ctta.analyzer import analyze
+from ctta.analyzestate import analyze_update, AnalyzeState
+
+from testctta.test_analyzer import source_event, write_trace
+
+
+class AnalyzeUpdateTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.state_path = os.path.join(root, "state.json")
+        self.files_list = [
+            write_trace(root, "aaa.json", [source_event(0, 100, "/usr/include/vector"), source_event(10, 50, "/a.h")]),
+            write_trace(root, "bbb.json", [source_event(0, 40, "/b.h"), source_event(50, 20, "/a.h")]),
+            write_trace(root, "ccc.json", [source_event(0, 30, "/c.h")]),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_full(self):
+        data_dict = analyze_update(self.files_list, ["/usr/*"], self.state_path, update=False)
+        self.assertEqual(data_dict, analyze(self.files_list, ["/usr/*"]))
+        self.assertTrue(os.path.isfile(self.state_path))
+
+    def test_update(self):
+        analyze_update(self.files_list, [], self.state_path)
+
+        ## modify one file and remove other
+        write_trace(self.temp_dir.name, "bbb.json", [source_event(0, 45, "/b.h"), source_event(50, 5, "/d.h")])
+        files_list = self.files_list[:2]
+
+        data_dict = analyze_update(files_list, ["/usr/*"], self.state_path)
+        self.assertEqual(data_dict, analyze(files_list, ["/usr/*"]))
+        self.assertNotIn("/c.h", data_dict)
+
+        state = AnalyzeState()
+        state.load(self.state_path)
+        self.assertEqual(len(state.files), 2)
+        self.assertEqual(state.totals["/a.h"].count, 1)
+
+    def test_update_unchanged(self):
+        analyze_update(self.files_list, [], self.state_path)
+        state = AnalyzeState()
+        state.load(self.state_path)
+        changed_list, removed_list = state.find_changes(self.files_list)
+        self.assertEqual(changed_list, [])
+        self.assertEqual(removed_list, [])
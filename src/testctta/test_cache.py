@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import tempfile
+import unittest
+
+from ctta.cache import ResultCache, CachedReader
+
+
+class ReaderMock:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, file_path):
+        self.calls += 1
+        with open(file_path, encoding="utf-8") as in_file:
+            return {"content": in_file.read()}
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.data_path = os.path.join(self.temp_dir.name, "data.json")
+        self.write_data("aaa")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_data(self, content):
+        with open(self.data_path, "w", encoding="utf-8") as out_file:
+            out_file.write(content)
+
+    def test_load_store(self):
+        cache = ResultCache(self.cache_dir)
+        self.assertEqual(cache.load("kind", self.data_path), (False, None))
+        cache.store("kind", self.data_path, [1, 2, 3])
+        self.assertEqual(cache.load("kind", self.data_path), (True, [1, 2, 3]))
+        self.assertEqual(cache.load("other", self.data_path), (False, None))
+
+    def test_reader(self):
+        cache = ResultCache(self.cache_dir)
+        reader_mock = ReaderMock()
+        reader = CachedReader(reader_mock, "kind", cache)
+        self.assertEqual(reader(self.data_path), {"content": "aaa"})
+        self.assertEqual(reader(self.data_path), {"content": "aaa"})
+        self.assertEqual(reader_mock.calls, 1)
+
+        ## modified file
+        self.write_data("bbbb")
+        self.assertEqual(reader(self.data_path), {"content": "bbbb"})
+        self.assertEqual(reader_mock.calls, 2)
+
+    def test_evict(self):
+        cache = ResultCache(self.cache_dir)
+        cache.store("kind1", self.data_path, "x" * 1000)
+        old_path = cache.get_path("kind1", self.data_path)
+        os.utime(old_path, ns=(0, 0))
+        cache.store("kind2", self.data_path, "y" * 1000)
+
+        cache.max_size = os.path.getsize(old_path) + 10
+        cache.evict()
+        self.assertEqual(cache.load("kind1", self.data_path), (False, None))
+        self.assertEqual(cache.load("kind2", self.data_path), (True, "y" * 1000))
+
+    def test_path_as_given(self):
+        ## results can contain path of file (e.g. names of callgrind functions)
+        cache = ResultCache(self.cache_dir)
+        reader = CachedReader(os.path.normpath, "kind", cache)
+        self.assertEqual(reader(self.data_path), self.data_path)
+        prev_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            self.assertEqual(reader("data.json"), "data.json")
+        finally:
+            os.chdir(prev_dir)
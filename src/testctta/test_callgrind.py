@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import io
+import re
+import gzip
+import tempfile
+import unittest
+
+from ctta.analyzer import read_callgrind_packed, unpack_entries
+from ctta.callgrind import CallgrindConverter, CallgrindWriter, MergedEntries, EVENTS_NUM, write_packed_stream
+
+from testctta.test_analyzer import source_event, write_trace, complete_event
+
+
+NAME_REGEX = re.compile(r"^\((\d+)\)(?: (.*))?$")
+
+
+## returns tuple (self costs of each function, [calls count, inclusive costs] of each call)
+## costs are lists of values of all events
+def parse_callgrind(content):
+    names_dict = {}
+    self_dict = {}
+    calls_dict = {}
+
+    def get_name(value):
+        found = NAME_REGEX.match(value)
+        if found is None:
+            return value
+        if found.group(2) is not None:
+            names_dict[found.group(1)] = found.group(2)
+        return names_dict[found.group(1)]
+
+    def add_costs(costs, line):
+        for idx, value in enumerate(line.split()[1:]):
+            costs[idx] += int(value)
+
+    function = None
+    callee = None
+    for line in content.splitlines():
+        if line.startswith("fn="):
+            function = get_name(line[3:])
+            callee = None
+        elif line.startswith("cfn="):
+            callee = get_name(line[4:])
+        elif line.startswith("calls="):
+            call_data = calls_dict.setdefault((function, callee), [0, [0] * EVENTS_NUM])
+            call_data[0] += int(line[6:].split()[0])
+        elif line and line[0].isdigit():
+            if callee is None:
+                add_costs(self_dict.setdefault(function, [0] * EVENTS_NUM), line)
+            else:
+                add_costs(calls_dict[(function, callee)][1], line)
+                callee = None
+    return self_dict, calls_dict
+
+
+class CallgrindWriterTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.files_list = [
+            write_trace(
+                root,
+                "aaa.json",
+                [
+                    complete_event(0, 100, "ExecuteCompiler"),
+                    complete_event(0, 80, "Frontend"),
+                    source_event(0, 30, "/proj/a.h"),
+                    source_event(40, 20, "/proj/b.h"),
+                    complete_event(0, 50, "Total Source"),
+                ],
+            ),
+            write_trace(
+                root,
+                "bbb.json",
+                [
+                    complete_event(0, 80, "ExecuteCompiler"),
+                    complete_event(0, 70, "Frontend"),
+                    source_event(0, 10, "/proj/b.h"),
+                ],
+            ),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_compressed_names(self):
+        out_file = io.StringIO()
+        writer = CallgrindWriter(out_file)
+        writer.write_costs("aaa", [1000, 1, 0, 0, 0], [("bbb", 1, [2000, 1, 2000, 0, 0])])
+        writer.write_costs("bbb", [2000, 1, 2000, 0, 0], [])
+        writer.write_costs("aaa", [1000, 1, 0, 0, 0], [("bbb", 1, [2000, 1, 2000, 0, 0])])
+        self.assertEqual(
+            out_file.getvalue(),
+            "fn=(1) aaa\n0 1000 1\ncfn=(2) bbb\ncalls=1 0\n0 2000 1 2000\n\n"
+            "fn=(2)\n0 2000 1 2000\n\n"
+            "fn=(1)\n0 1000 1\ncfn=(2)\ncalls=1 0\n0 2000 1 2000\n\n",
+        )
+        self.assertEqual(list(writer.total), [4000, 3, 2000, 0, 0])
+
+    def test_converter_costs(self):
+        packed_lists = [read_callgrind_packed(file_path) for file_path in self.files_list]
+        out_file = io.StringIO()
+        writer = CallgrindWriter(out_file)
+        writer.write_header()
+        for packed_list in packed_lists:
+            writer.write_packed(packed_list)
+        writer.write_footer()
+
+        data_entries = []
+        for packed_list in packed_lists:
+            data_entries.extend(unpack_entries(packed_list[0]))
+        converter_file = io.StringIO()
+        CallgrindConverter(data_entries).output(converter_file)
+
+        self_dict, calls_dict = parse_callgrind(out_file.getvalue())
+        converter_self, converter_calls = parse_callgrind(converter_file.getvalue())
+        self.assertEqual(self_dict.keys(), converter_self.keys())
+        for name, costs in self_dict.items():
+            self.assertAlmostEqual(costs[0], converter_self[name][0], delta=1)
+        self.assertEqual(calls_dict.keys(), converter_calls.keys())
+        for key, (count, costs) in calls_dict.items():
+            self.assertEqual(count, converter_calls[key][0])
+            self.assertAlmostEqual(costs[0], converter_calls[key][1][0], delta=1)
+        self.assertEqual(list(writer.total), [sum(column) for column in zip(*self_dict.values())])
+
+    def test_write_gzip(self):
+        out_path = f"{self.temp_dir.name}/out.callgrind.gz"
+        packed_iter = (read_callgrind_packed(file_path) for file_path in self.files_list)
+        write_packed_stream(packed_iter, out_path, view=False)
+        with gzip.open(out_path, "rt", encoding="utf-8") as in_file:
+            content = in_file.read()
+        self.assertTrue(content.startswith("# callgrind format\n"))
+        self_dict, calls_dict = parse_callgrind(content)
+        aaa_path, bbb_path = self.files_list
+        self.assertEqual(self_dict[aaa_path], [20000, 1, 0, 0, 0])
+        self.assertEqual(self_dict[bbb_path], [10000, 1, 0, 0, 0])
+        self.assertEqual(self_dict[f"{aaa_path}:Frontend"], [30000, 1, 30000, 0, 0])
+        self.assertEqual(self_dict["/proj/b.h"], [30000, 2, 30000, 0, 0])
+        self.assertEqual(calls_dict[(aaa_path, f"{aaa_path}:Frontend")], [1, [80000, 3, 80000, 0, 0]])
+        self.assertEqual(calls_dict[(f"{bbb_path}:Frontend", "/proj/b.h")], [1, [10000, 1, 10000, 0, 0]])
+
+    def test_phases(self):
+        file_path = write_trace(
+            self.temp_dir.name,
+            "ccc.json",
+            [
+                complete_event(0, 100, "ExecuteCompiler"),
+                complete_event(0, 60, "Frontend"),
+                source_event(0, 10, "/proj/a.h"),
+                complete_event(20, 30, "PerformPendingInstantiations"),
+                complete_event(20, 25, "InstantiateFunction"),
+                complete_event(60, 40, "Backend"),
+                complete_event(60, 35, "OptModule"),
+            ],
+        )
+        out_file = io.StringIO()
+        writer = CallgrindWriter(out_file)
+        writer.write_packed(read_callgrind_packed(file_path))
+        self_dict, calls_dict = parse_callgrind(out_file.getvalue())
+        self.assertEqual(self_dict[file_path], [0, 1, 0, 0, 0])
+        self.assertEqual(self_dict["/proj/a.h"], [10000, 1, 10000, 0, 0])
+        self.assertEqual(self_dict["InstantiateFunction"], [25000, 1, 0, 0, 25000])
+        self.assertEqual(self_dict["OptModule"], [35000, 1, 0, 35000, 0])
+        self.assertEqual(calls_dict[(file_path, f"{file_path}:Frontend")], [1, [60000, 4, 30000, 0, 30000]])
+        self.assertEqual(calls_dict[(file_path, f"{file_path}:Backend")], [1, [40000, 2, 0, 40000, 0]])
+        self.assertEqual(list(writer.total), [100000, 7, 30000, 40000, 30000])
+
+    def test_merge(self):
+        packed_lists = [read_callgrind_packed(file_path) for file_path in self.files_list]
+        out_file = io.StringIO()
+        writer = CallgrindWriter(out_file)
+        for packed_list in packed_lists:
+            writer.write_packed(packed_list)
+
+        merged = MergedEntries()
+        for packed_list in packed_lists:
+            merged.add_packed(packed_list)
+        merged_file = io.StringIO()
+        merged_writer = CallgrindWriter(merged_file)
+        merged.write(merged_writer)
+
+        self.assertEqual(parse_callgrind(merged_file.getvalue()), parse_callgrind(out_file.getvalue()))
+        self.assertEqual(merged_writer.total, writer.total)
+        ## each name is written once
+        functions_list = [line for line in merged_file.getvalue().splitlines() if line.startswith("fn=")]
+        self.assertEqual(len(functions_list), len(merged.functions))
+        self.assertEqual(list(merged.functions["/proj/b.h"]), [30000, 2, 30000, 0, 0])
+        aaa_path, bbb_path = self.files_list
+        calls_dict = merged.calls[f"{aaa_path}:Frontend"]
+        self.assertEqual(list(calls_dict["/proj/a.h"]), [1, 30000, 1, 30000, 0, 0])
+        self.assertEqual(list(calls_dict["/proj/b.h"]), [1, 20000, 1, 20000, 0, 0])
+        self.assertEqual(list(merged.calls[f"{bbb_path}:Frontend"]["/proj/b.h"]), [1, 10000, 1, 10000, 0, 0])
+
+    def test_threads(self):
+        events_list = [
+            complete_event(0, 100, "ExecuteCompiler"),
+            complete_event(0, 60, "Frontend"),
+            {"pid": 1, "tid": 1, "ph": "X", "ts": 50, "dur": 100, "name": "Backend"},
+            {"pid": 1, "tid": 1, "ph": "X", "ts": 60, "dur": 40, "name": "OptModule"},
+        ]
+        file_path = write_trace(self.temp_dir.name, "threads.json", events_list)
+        packed = read_callgrind_packed(file_path)
+        self.assertEqual(len(packed[0]), 4)
+        self.assertEqual(packed[1], bytes([0, 1, 2, 2]))
+
+        out_file = io.StringIO()
+        writer = CallgrindWriter(out_file)
+        writer.write_packed(packed)
+        self_dict, calls_dict = parse_callgrind(out_file.getvalue())
+        self.assertEqual(self_dict["OptModule"], [40000, 1, 0, 40000, 0])
+        self.assertEqual(calls_dict[(f"{file_path}:Backend", "OptModule")], [1, [40000, 1, 0, 40000, 0]])
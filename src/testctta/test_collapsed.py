@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import io
+import gzip
+import tempfile
+import unittest
+
+from ctta.collapsed import export_collapsed, write_collapsed
+from ctta.flamemerge import merge_flame_stacks
+
+from testctta.test_analyzer import source_event, write_trace, complete_event
+
+
+class CollapsedTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.files_list = [
+            write_trace(
+                root,
+                "aaa.json",
+                [
+                    complete_event(0, 100, "ExecuteCompiler"),
+                    complete_event(0, 80, "Frontend"),
+                    source_event(0, 30, "/proj/a;b.h"),
+                    source_event(40, 20, "/proj/b.h"),
+                    complete_event(0, 50, "Total Source"),
+                ],
+            ),
+            write_trace(
+                root,
+                "bbb.json",
+                [
+                    complete_event(0, 80, "ExecuteCompiler"),
+                    complete_event(0, 70, "Frontend"),
+                    source_event(0, 10, "/proj/b.h"),
+                ],
+            ),
+        ]
+        self.expected = [
+            "ExecuteCompiler 30",
+            "ExecuteCompiler;Frontend 90",
+            "ExecuteCompiler;Frontend;/proj/a:b.h 30",
+            "ExecuteCompiler;Frontend;/proj/b.h 30",
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write(self):
+        stacks = merge_flame_stacks(self.files_list)
+        out_file = io.StringIO()
+        lines_num = write_collapsed(stacks.top, out_file)
+        self.assertEqual(out_file.getvalue().splitlines(), self.expected)
+        self.assertEqual(lines_num, 4)
+
+    def test_export_gzip(self):
+        out_path = os.path.join(self.temp_dir.name, "stacks.txt.gz")
+        export_collapsed(self.files_list, out_path)
+        with gzip.open(out_path, "rt", encoding="utf-8") as in_file:
+            self.assertEqual(in_file.read().splitlines(), self.expected)
+
+    def test_export_text(self):
+        out_path = os.path.join(self.temp_dir.name, "stacks.txt")
+        export_collapsed(self.files_list[:1], out_path)
+        with open(out_path, encoding="utf-8") as in_file:
+            self.assertEqual(in_file.read().splitlines()[0], "ExecuteCompiler 20")
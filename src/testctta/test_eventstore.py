@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from ctta.eventree import EventTree
+from ctta.eventstore import EventStore, ThreadStores
+from ctta.analyzer import get_blocks_from_tree, get_entries_from_tree, pack_entries
+
+
+EVENTS_LIST = [
+    {"ph": "X", "ts": 20, "dur": 10, "name": "Source", "args": {"detail": "/usr/include/vector"}},
+    {"ph": "X", "ts": 35, "dur": 5, "name": "Source", "args": {"detail": "/proj/a.h"}},
+    {"ph": "X", "ts": 10, "dur": 50, "name": "Frontend"},
+    {"ph": "X", "ts": 60, "dur": 30, "name": "Backend"},
+    {"ph": "X", "ts": 0, "dur": 100, "name": "ExecuteCompiler"},
+]
+
+
+class EventStoreTest(unittest.TestCase):
+    def test_nest(self):
+        store = EventStore()
+        store.add_events(EVENTS_LIST)
+        store.nest()
+
+        self.assertEqual(len(store), 5)
+        self.assertEqual(list(store.ts), [0, 10, 20, 35, 60])
+        self.assertEqual(list(store.level), [0, 1, 2, 2, 1])
+        self.assertEqual(list(store.parent), [-1, 0, 1, 1, 0])
+        self.assertEqual(store.get_label(2), "/usr/include/vector")
+        self.assertEqual(store.get_name(2), "Source")
+        self.assertEqual(list(store.get_children_durations()), [80, 15, 0, 0, 0])
+        ## names are interned
+        self.assertEqual(store.name_id[2], store.name_id[3])
+
+    def test_blocks(self):
+        tree = EventTree()
+        tree.add_events(EVENTS_LIST)
+        store = EventStore()
+        store.add_events(EVENTS_LIST)
+
+        tree_blocks = get_blocks_from_tree(tree, 0)
+        store_blocks = get_blocks_from_tree(store, 0)
+        self.assertEqual(sorted(tree_blocks, key=repr), sorted(store_blocks, key=repr))
+
+    def test_entries(self):
+        tree = EventTree()
+        tree.add_events(EVENTS_LIST)
+        store = EventStore()
+        store.add_events(EVENTS_LIST)
+
+        tree_entries = get_entries_from_tree(tree, "file.cpp")
+        store_entries = get_entries_from_tree(store, "file.cpp")
+
+        def entry_key(entry):
+            return (entry.code, entry.inlinetime, entry.totaltime, tuple(child.code for child in entry.calls))
+
+        self.assertEqual(sorted(map(entry_key, tree_entries)), sorted(map(entry_key, store_entries)))
+        ## both are placed in pre-order
+        self.assertEqual(pack_entries(tree_entries), pack_entries(store_entries))
+        self.assertEqual(store_entries[0].code, "file.cpp")
+        self.assertEqual(store_entries[1].code, "file.cpp:Frontend")
+
+
+## intervals of threads overlap partially
+THREADS_EVENTS_LIST = [
+    {"pid": 1, "tid": 0, "ph": "X", "ts": 0, "dur": 100, "name": "ExecuteCompiler"},
+    {"pid": 1, "tid": 0, "ph": "X", "ts": 0, "dur": 60, "name": "Frontend"},
+    {"pid": 1, "tid": 1, "ph": "X", "ts": 50, "dur": 100, "name": "Backend"},
+    {"pid": 1, "tid": 1, "ph": "X", "ts": 60, "dur": 40, "name": "OptModule"},
+]
+
+
+class ThreadStoresTest(unittest.TestCase):
+    def test_overlap(self):
+        store = EventStore()
+        store.add_events(THREADS_EVENTS_LIST)
+        self.assertRaises(RuntimeError, store.nest)
+
+        stores = ThreadStores()
+        stores.add_events(THREADS_EVENTS_LIST)
+        self.assertEqual(list(stores.stores.keys()), [(1, 0), (1, 1)])
+        self.assertEqual(len(stores), 4)
+        for thread_store in stores.get_stores():
+            thread_store.nest()
+            self.assertEqual(list(thread_store.parent), [-1, 0])
+
+    def test_blocks(self):
+        stores = ThreadStores()
+        stores.add_events(THREADS_EVENTS_LIST)
+        blocks = get_blocks_from_tree(stores, 0)
+        blocks_data = [(block.name, block.x, block.w, block.level) for block in blocks]
+        self.assertEqual(
+            blocks_data,
+            [
+                ("thread 0 (pid 1)", 0, 100, 0),
+                ("ExecuteCompiler", 0, 100, 1),
+                ("Frontend", 0, 60, 2),
+                ("thread 1 (pid 1)", 50, 100, 3),
+                ("Backend", 50, 100, 4),
+                ("OptModule", 60, 40, 5),
+            ],
+        )
+
+    def test_single_thread(self):
+        stores = ThreadStores()
+        stores.add_events(THREADS_EVENTS_LIST[:2])
+        store = EventStore()
+        store.add_events(THREADS_EVENTS_LIST[:2])
+        self.assertEqual(get_blocks_from_tree(stores, 0), get_blocks_from_tree(store, 0))
+
+    def test_entries(self):
+        stores = ThreadStores()
+        stores.add_events(THREADS_EVENTS_LIST)
+        entries = get_entries_from_tree(stores, "file.cpp")
+        self.assertEqual(
+            [(entry.code, [child.code for child in entry.calls]) for entry in entries],
+            [
+                ("file.cpp", ["file.cpp:Frontend"]),
+                ("file.cpp:Frontend", []),
+                ("file.cpp:Backend", ["OptModule"]),
+                ("OptModule", []),
+            ],
+        )
@@ -8,9 +8,12 @@
 #
 
 import unittest
+import random
 
 from ctta.eventree import EventTree
 
+from testctta.benchmark_eventtree import LegacyItem
+
 
 class EventTreeMock(EventTree):
     def add_simple(self, start, end):
@@ -105,3 +108,176 @@ class EventTreeTest(unittest.TestCase):
         self.assertEqual(items_list[1].level, 1)
         self.assertEqual(items_list[2].middle(), 350.0)
         self.assertEqual(items_list[2].level, 1)
+
+    def test_add_event_cover_range(self):
+        tree = EventTreeMock()
+        for idx in range(10):
+            tree.add_simple(idx * 10, idx * 10 + 5)
+        tree.add_simple(30, 65)
+
+        top_items = tree._container.children  # pylint: disable=W0212
+        self.assertEqual(len(top_items), 7)
+        self.assertEqual(top_items[3].start(), 30)
+        self.assertEqual(top_items[3].level, 0)
+        self.assertEqual([item.start() for item in top_items[3].children], [30, 40, 50, 60])
+        self.assertEqual([item.level for item in top_items[3].children], [1, 1, 1, 1])
+
+    def test_add_event_between(self):
+        tree = EventTreeMock()
+        tree.add_simple(0, 10)
+        tree.add_simple(20, 30)
+        tree.add_simple(40, 50)
+        tree.add_simple(12, 18)
+        tree.add_simple(22, 28)
+
+        top_items = tree._container.children  # pylint: disable=W0212
+        self.assertEqual([item.start() for item in top_items], [0, 12, 20, 40])
+        self.assertEqual([item.start() for item in top_items[2].children], [22])
+
+    def test_add_event_overlap(self):
+        tree = EventTreeMock()
+        tree.add_simple(0, 10)
+        tree.add_simple(20, 30)
+        with self.assertRaises(RuntimeError):
+            tree.add_simple(5, 15)
+        with self.assertRaises(RuntimeError):
+            tree.add_simple(15, 25)
+
+    def test_walk(self):
+        tree = EventTreeMock()
+        tree.add_simple(100, 200)
+        tree.add_simple(300, 400)
+        tree.add_simple(50, 450)
+        tree.add_simple(120, 140)
+
+        items_list = [(item.start(), level) for item, level in tree.walk()]
+        self.assertEqual(items_list, [(50, 0), (100, 1), (120, 2), (300, 1)])
+        self.assertEqual([item.start() for item in tree.iter_children()], [50, 100, 120, 300])
+        self.assertEqual([item.start() for item in tree.get_children()], [50, 100, 300, 120])
+
+    def test_deep_chain(self):
+        depth = 2000
+        events_list = [{"ts": idx, "dur": 2 * (depth - idx)} for idx in range(depth)]
+        for engine, reverse in [("incremental", False), ("incremental", True), ("bulk", True)]:
+            tree = EventTree()
+            tree.add_events(reversed(events_list) if reverse else events_list, engine=engine)
+
+            items_list = tree.get_children()
+            self.assertEqual(len(items_list), depth)
+            self.assertEqual(items_list[-1].level, depth - 1)
+            levels_list = [level for _, level in tree.walk()]
+            self.assertEqual(levels_list, list(range(depth)))
+
+
+## generate random set of nested or disjoint intervals
+## includes zero-length intervals and intervals touching boundaries of neighbours and parent
+def generate_intervals(rand_gen, start, end, depth):
+    events_list = []
+    pos = start
+    while pos <= end and rand_gen.random() < 0.8:
+        item_start = rand_gen.randint(pos, end)
+        if rand_gen.random() < 0.2:
+            ## zero-length interval
+            item_end = item_start
+        else:
+            item_end = rand_gen.randint(item_start, end)
+        events_list.append({"ts": item_start, "dur": item_end - item_start})
+        if rand_gen.random() < 0.1:
+            ## identical interval
+            events_list.append({"ts": item_start, "dur": item_end - item_start})
+        if depth > 0 and item_end > item_start:
+            events_list.extend(generate_intervals(rand_gen, item_start, item_end, depth - 1))
+        ## next interval can start at end of current one
+        pos = item_end
+    return events_list
+
+
+## returns list of tuples (event index, level, parent event index)
+def get_tree_links(tree, events_list):
+    index_dict = {id(event): idx for idx, event in enumerate(events_list)}
+    links_list = []
+    items_list = [(None, item) for item in tree._container.children]  # pylint: disable=W0212
+    while items_list:
+        parent, item = items_list.pop()
+        parent_idx = -1 if parent is None else index_dict[id(parent.event_data)]
+        links_list.append((index_dict[id(item.event_data)], item.level, parent_idx))
+        items_list.extend((item, child) for child in item.children)
+    return sorted(links_list)
+
+
+## returns list of tuples (interval, level, parent interval) -- does not depend on order of events
+def get_interval_links(tree):
+    links_list = []
+    for item in tree.get_children():
+        parent = item.parent
+        parent_interval = None if parent is None or parent.parent is None else (parent.start(), parent.end())
+        links_list.append(((item.start(), item.end()), item.level, parent_interval))
+    return sorted(links_list, key=str)
+
+
+class EventTreeEnginesTest(unittest.TestCase):
+    def test_engines_equal(self):
+        rand_gen = random.Random(0)
+        for _ in range(300):
+            events_list = generate_intervals(rand_gen, 0, 1000, 5)
+            rand_gen.shuffle(events_list)
+
+            incremental_tree = EventTree()
+            incremental_tree.add_events(events_list, engine="incremental")
+            bulk_tree = EventTree()
+            bulk_tree.add_events(events_list, engine="bulk")
+
+            incremental_links = get_tree_links(incremental_tree, events_list)
+            bulk_links = get_tree_links(bulk_tree, events_list)
+            self.assertEqual(len(bulk_links), len(events_list))
+            self.assertEqual(incremental_links, bulk_links)
+
+            incremental_children = incremental_tree.get_children()
+            bulk_children = bulk_tree.get_children()
+            self.assertEqual(
+                [item.event_data for item in incremental_children], [item.event_data for item in bulk_children]
+            )
+
+    def test_insertion_order(self):
+        rand_gen = random.Random(1)
+        for _ in range(100):
+            events_list = generate_intervals(rand_gen, 0, 100, 4)
+            bulk_tree = EventTree()
+            bulk_tree.add_events(events_list, engine="bulk")
+            expected_links = get_interval_links(bulk_tree)
+            for engine in ("incremental", "bulk"):
+                shuffled_list = list(events_list)
+                rand_gen.shuffle(shuffled_list)
+                tree = EventTree()
+                tree.add_events(shuffled_list, engine=engine)
+                self.assertEqual(get_interval_links(tree), expected_links)
+
+    def test_zero_length_boundary(self):
+        ## zero-length event on boundary of touching events is nested in the second one
+        events_list = [{"ts": 0, "dur": 10}, {"ts": 10, "dur": 0}, {"ts": 10, "dur": 10}]
+        for engine in ("incremental", "bulk"):
+            for order in ([0, 1, 2], [2, 1, 0], [1, 0, 2], [0, 2, 1]):
+                tree = EventTree()
+                tree.add_events([events_list[idx] for idx in order], engine=engine)
+                self.assertEqual(
+                    [(item.start(), level) for item, level in tree.walk()], [(0, 0), (10, 0), (10, 1)], (engine, order)
+                )
+                self.assertEqual(tree.get_top_items()[1].children[0].end(), 10)
+
+    def test_zero_length_boundary_legacy(self):
+        ## previous implementation nested zero-length event in the first touching event,
+        ## unless the second event was added before it (see doc/changelog.md)
+        events_list = [{"ts": 0, "dur": 10}, {"ts": 10, "dur": 0}, {"ts": 10, "dur": 10}]
+        parent_start = {(0, 1, 2): 0, (2, 1, 0): 10, (1, 0, 2): 0, (0, 2, 1): 0}
+        for order, start in parent_start.items():
+            root = LegacyItem()
+            for idx in order:
+                root.add_item(LegacyItem(events_list[idx]))
+            parents_list = [item for item in root.children if item.children]
+            self.assertEqual([item.start() for item in parents_list], [start], order)
+            self.assertEqual(parents_list[0].children[0].end(), 10)
+
+    def test_bulk_overlap(self):
+        tree = EventTree()
+        with self.assertRaises(RuntimeError):
+            tree.add_events([{"ts": 0, "dur": 10}, {"ts": 5, "dur": 10}])
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import tempfile
+import unittest
+
+from ctta.flamemerge import merge_flame_stacks, get_merged_flame_blocks, draw_merged_flame_svg
+
+from testctta.test_analyzer import source_event, write_trace, complete_event, clang_trace_events
+
+
+class MergeFlameStacksTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.files_list = [
+            write_trace(
+                root,
+                "aaa.json",
+                [
+                    complete_event(0, 100, "ExecuteCompiler"),
+                    complete_event(0, 80, "Frontend"),
+                    source_event(0, 30, "/proj/a.h"),
+                    source_event(40, 20, "/proj/b.h"),
+                    complete_event(0, 50, "Total Source"),
+                ],
+            ),
+            write_trace(
+                root,
+                "bbb.json",
+                [
+                    complete_event(0, 200, "ExecuteCompiler"),
+                    complete_event(0, 50, "Frontend"),
+                    source_event(0, 10, "/proj/b.h"),
+                    source_event(20, 5, "/proj/b.h"),
+                    complete_event(60, 100, "Backend"),
+                    complete_event(0, 15, "Total Source"),
+                ],
+            ),
+            write_trace(root, "ccc.json", []),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_merge(self):
+        stacks = merge_flame_stacks(self.files_list)
+        blocks, bblocks = get_merged_flame_blocks(stacks)
+        blocks_list = [(block.full_name, block.x, block.w, block.level) for block in blocks]
+        self.assertEqual(
+            blocks_list,
+            [
+                ("ExecuteCompiler", 0, 300, 0),
+                ("Backend", 0, 100, 1),
+                ("Frontend", 100, 130, 1),
+                ("/proj/a.h", 100, 30, 2),
+                ("/proj/b.h", 130, 35, 2),
+            ],
+        )
+        self.assertEqual([(block.full_name, block.w) for block in bblocks], [("Total Source", 65)])
+
+    def test_merge_jobs(self):
+        serial_stacks = merge_flame_stacks(self.files_list)
+        parallel_stacks = merge_flame_stacks(self.files_list, jobs=2)
+        self.assertEqual(serial_stacks.pack(), parallel_stacks.pack())
+
+    def test_draw(self):
+        out_path = os.path.join(self.temp_dir.name, "merged.svg")
+        draw_merged_flame_svg(self.files_list, out_path)
+        self.assertTrue(os.path.isfile(out_path))
+
+    def test_total_events(self):
+        file_path = write_trace(self.temp_dir.name, "clang.json", clang_trace_events())
+        stacks = merge_flame_stacks([file_path])
+        top_blocks, bottom_blocks = get_merged_flame_blocks(stacks)
+        self.assertEqual(max(block.right() for block in top_blocks), 100)
+        ## summary events are nested, so bottom part is not wider than longest summary event
+        self.assertEqual(
+            [(block.full_name, block.x, block.w, block.level) for block in bottom_blocks],
+            [("Total ExecuteCompiler", 0, 60, 0), ("Total Frontend", 0, 40, 1), ("Total Source", 0, 30, 2)],
+        )
+
+    def test_threads(self):
+        ## backend thread overlaps partially main thread
+        events_list = [
+            complete_event(0, 100, "ExecuteCompiler"),
+            complete_event(0, 60, "Frontend"),
+            {"pid": 1, "tid": 1, "ph": "X", "ts": 50, "dur": 100, "name": "ExecuteCompiler"},
+            {"pid": 1, "tid": 1, "ph": "X", "ts": 60, "dur": 40, "name": "Backend"},
+        ]
+        file_path = write_trace(self.temp_dir.name, "threads.json", events_list)
+        stacks = merge_flame_stacks([file_path])
+        blocks = get_merged_flame_blocks(stacks)[1]
+        blocks_list = [(block.full_name, block.x, block.w, block.level) for block in blocks]
+        self.assertEqual(
+            blocks_list,
+            [
+                ("ExecuteCompiler", 0, 200, 0),
+                ("Backend", 0, 40, 1),
+                ("Frontend", 40, 60, 1),
+            ],
+        )
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import random
+import tempfile
+import unittest
+
+from ctta.hotspots import strip_template_args, find_hotspots, select_top, HotSpot
+
+from testctta.test_analyzer import write_trace
+
+
+def template_event(ts, dur, name, detail):
+    return {"pid": 1, "tid": 0, "ph": "X", "ts": ts, "dur": dur, "name": name, "args": {"detail": detail}}
+
+
+class StripTemplateArgsTest(unittest.TestCase):
+    def test_strip(self):
+        self.assertEqual(strip_template_args("ns::func"), "ns::func")
+        self.assertEqual(strip_template_args("std::vector<int>"), "std::vector<>")
+        self.assertEqual(
+            strip_template_args("std::map<int, std::pair<int, char>>::insert<const int &>"), "std::map<>::insert<>"
+        )
+        self.assertEqual(strip_template_args("std::array<int, (1 > 0)>"), "std::array<>")
+
+    def test_operators(self):
+        self.assertEqual(strip_template_args("Foo<int>::operator<"), "Foo<>::operator<")
+        self.assertEqual(strip_template_args("operator<<<std::string>"), "operator<<<>")
+        self.assertEqual(strip_template_args("Foo<int>::operator->"), "Foo<>::operator->")
+        self.assertEqual(strip_template_args("Foo::operator>=<Bar<int>>"), "Foo::operator>=<>")
+        self.assertEqual(strip_template_args("Foo::operator<=>"), "Foo::operator<=>")
+        self.assertEqual(strip_template_args("Foo<int>::my_operator<int>"), "Foo<>::my_operator<>")
+
+
+class FindHotspotsTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.files_list = [
+            write_trace(
+                root,
+                "aaa.json",
+                [
+                    template_event(0, 100, "InstantiateClass", "std::vector<int>"),
+                    template_event(100, 50, "InstantiateClass", "std::vector<char>"),
+                    template_event(200, 10, "InstantiateFunction", "std::sort<int *>"),
+                    template_event(300, 500, "Source", "/usr/include/vector"),
+                ],
+            ),
+            write_trace(
+                root,
+                "bbb.json",
+                [
+                    template_event(0, 30, "InstantiateClass", "std::vector<long>"),
+                    template_event(100, 80, "ParseClass", "Foo"),
+                    template_event(200, 60, "InstantiateFunction", "std::sort<char *>"),
+                ],
+            ),
+            write_trace(root, "ccc.json", []),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_find(self):
+        hotspots_dict = find_hotspots(self.files_list, top=2)
+        self.assertEqual(
+            hotspots_dict["total"],
+            [HotSpot("std::vector<>", "InstantiateClass", 180, 3), HotSpot("Foo", "ParseClass", 80, 1)],
+        )
+        self.assertEqual(
+            hotspots_dict["mean"],
+            [HotSpot("Foo", "ParseClass", 80, 1), HotSpot("std::vector<>", "InstantiateClass", 180, 3)],
+        )
+        self.assertEqual(
+            hotspots_dict["count"],
+            [
+                HotSpot("std::vector<>", "InstantiateClass", 180, 3),
+                HotSpot("std::sort<>", "InstantiateFunction", 70, 2),
+            ],
+        )
+
+    def test_find_args(self):
+        hotspots_dict = find_hotspots(self.files_list, event_names=["InstantiateClass"], strip_args=False, jobs=2)
+        names_list = [item.name for item in hotspots_dict["total"]]
+        self.assertEqual(names_list, ["std::vector<int>", "std::vector<char>", "std::vector<long>"])
+
+
+class SelectTopTest(unittest.TestCase):
+    def test_select(self):
+        rand = random.Random(1)
+        items_list = [HotSpot(str(idx), "", rand.randint(1, 50), rand.randint(1, 5)) for idx in range(200)]
+        top_dict = select_top(iter(items_list), 10)
+        self.assertEqual(top_dict["total"], sorted(items_list, key=lambda item: item.dur, reverse=True)[:10])
+        self.assertEqual(top_dict["mean"], sorted(items_list, key=lambda item: item.avg(), reverse=True)[:10])
+        self.assertEqual(top_dict["count"], sorted(items_list, key=lambda item: item.count, reverse=True)[:10])
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import json
+import tempfile
+import unittest
+
+from ctta import jsonbackend
+from ctta.jsonbackend import resolve_backend, get_available_backends, AUTO_STREAM_SIZE
+from ctta.tracereader import iter_events
+
+
+class JsonBackendTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, content):
+        file_path = os.path.join(self.temp_dir.name, "trace.json")
+        with open(file_path, "w", encoding="utf-8") as out_file:
+            out_file.write(content)
+        return file_path
+
+    def test_resolve(self):
+        self.assertEqual(resolve_backend("stream"), "stream")
+        self.assertEqual(resolve_backend("json"), "json")
+        self.assertEqual(resolve_backend("auto", AUTO_STREAM_SIZE + 1), "stream")
+        self.assertIn(resolve_backend("auto"), jsonbackend.NATIVE_BACKENDS + ["json"])
+
+    def test_resolve_unavailable(self):
+        jsonbackend._LOADS_DICT["ujson"] = None  # pylint: disable=W0212
+        try:
+            self.assertRaises(ValueError, resolve_backend, "ujson")
+            self.assertNotIn("ujson", get_available_backends())
+        finally:
+            del jsonbackend._LOADS_DICT["ujson"]  # pylint: disable=W0212
+
+    def test_resolve_auto_fallback(self):
+        saved_dict = dict(jsonbackend._LOADS_DICT)  # pylint: disable=W0212
+        try:
+            for native in jsonbackend.NATIVE_BACKENDS:
+                jsonbackend._LOADS_DICT[native] = None  # pylint: disable=W0212
+            self.assertEqual(resolve_backend("auto"), "json")
+            self.assertEqual(resolve_backend("auto", AUTO_STREAM_SIZE + 1), "stream")
+        finally:
+            jsonbackend._LOADS_DICT.clear()  # pylint: disable=W0212
+            jsonbackend._LOADS_DICT.update(saved_dict)  # pylint: disable=W0212
+
+    def test_iter_events(self):
+        events_list = [{"ph": "X", "ts": idx, "dur": 10, "name": "Source"} for idx in range(5)]
+        file_path = self.write_file(json.dumps({"traceEvents": events_list}))
+        for backend in get_available_backends():
+            self.assertEqual(list(iter_events(file_path, backend)), events_list, backend)
+
+    def test_malformed(self):
+        file_path = self.write_file('{"traceEvents": [{"ph": "X"},')
+        for backend in get_available_backends():
+            with self.assertRaises(json.decoder.JSONDecodeError, msg=backend):
+                list(iter_events(file_path, backend))
+
+    def test_empty_file(self):
+        file_path = self.write_file("")
+        self.assertEqual(list(iter_events(file_path, "stream")), [])
+        for backend in get_available_backends():
+            if resolve_backend(backend) == "stream":
+                continue
+            with self.assertRaises(json.decoder.JSONDecodeError, msg=backend):
+                list(iter_events(file_path, backend))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ctta.main import main, is_up_to_date
+from ctta.analyzer import draw_flame_svg
+
+from testctta.test_analyzer import source_event, write_trace, complete_event
+
+
+## modification time of trace files (in seconds)
+TRACE_MTIME = 1000000
+
+
+def set_mtime(file_path, mtime):
+    os.utime(file_path, (mtime, mtime))
+
+
+def write_file(file_path, content):
+    with open(file_path, "w", encoding="utf-8") as out_file:
+        out_file.write(content)
+
+
+def read_file(file_path):
+    with open(file_path, encoding="utf-8") as in_file:
+        return in_file.read()
+
+
+class FlamegraphsUpToDateTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        events_list = [complete_event(0, 100, "Frontend"), source_event(0, 50, "/proj/a.h")]
+        self.trace_path = write_trace(self.temp_dir.name, "aaa.json", events_list)
+        set_mtime(self.trace_path, TRACE_MTIME)
+        self.svg_path = f"{self.trace_path}.svg"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_flamegraphs(self, *args):
+        with mock.patch("sys.argv", ["ctta", "flamegraphs", "-f", self.trace_path, *args]):
+            return main()
+
+    def test_missing(self):
+        self.assertEqual(self.run_flamegraphs(), 0)
+        self.assertIn("<svg", read_file(self.svg_path))
+        self.assertTrue(is_up_to_date(self.svg_path, self.trace_path))
+
+    def test_fresh(self):
+        write_file(self.svg_path, "previous")
+        set_mtime(self.svg_path, TRACE_MTIME + 1)
+        self.assertEqual(self.run_flamegraphs(), 0)
+        self.assertEqual(read_file(self.svg_path), "previous")
+
+    def test_stale(self):
+        write_file(self.svg_path, "previous")
+        set_mtime(self.svg_path, TRACE_MTIME - 1)
+        self.assertFalse(is_up_to_date(self.svg_path, self.trace_path))
+        self.assertEqual(self.run_flamegraphs(), 0)
+        self.assertIn("<svg", read_file(self.svg_path))
+
+    def test_force(self):
+        write_file(self.svg_path, "previous")
+        set_mtime(self.svg_path, TRACE_MTIME + 1)
+        self.assertEqual(self.run_flamegraphs("--force"), 0)
+        self.assertIn("<svg", read_file(self.svg_path))
+
+    def test_empty_trace(self):
+        write_trace(self.temp_dir.name, "aaa.json", [])
+        set_mtime(self.trace_path, TRACE_MTIME)
+        self.assertEqual(self.run_flamegraphs(), 0)
+        self.assertFalse(os.path.exists(self.svg_path))
+
+        ## file without events is stamped in cache, so it is not parsed again
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        with mock.patch("ctta.main.draw_flame_svg", wraps=draw_flame_svg) as draw_mock:
+            self.assertEqual(self.run_flamegraphs("--cache-dir", cache_dir), 0)
+            self.assertEqual(self.run_flamegraphs("--cache-dir", cache_dir), 0)
+            self.assertEqual(draw_mock.call_count, 1)
+            ## modified file is parsed
+            set_mtime(self.trace_path, TRACE_MTIME + 1)
+            self.assertEqual(self.run_flamegraphs("--cache-dir", cache_dir), 0)
+            self.assertEqual(draw_mock.call_count, 2)
+        self.assertFalse(os.path.exists(self.svg_path))
+
+    def test_not_trace(self):
+        ## e.g. compilation database found in directory
+        write_file(self.trace_path, '[{"file": "main.cpp"}]')
+        self.assertEqual(self.run_flamegraphs(), 0)
+        self.assertFalse(os.path.exists(self.svg_path))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import re
+import random
+import unittest
+
+from ctta.matcher import PathMatcher, translate_pattern
+
+
+## reference implementation -- each pattern checked separately, empty patterns are ignored
+def match_reference(patterns_list, item):
+    for pattern in patterns_list:
+        if not pattern:
+            continue
+        if "*" not in pattern:
+            if item == pattern:
+                return True
+        elif re.match(translate_pattern(pattern), item, re.DOTALL):
+            return True
+    return False
+
+
+class PathMatcherTest(unittest.TestCase):
+    def test_exact(self):
+        matcher = PathMatcher(["/usr/include/vector", ""])
+        self.assertTrue(matcher.match("/usr/include/vector"))
+        self.assertFalse(matcher.match("/usr/include/vector.h"))
+        self.assertFalse(matcher.match(""))
+
+    def test_prefix(self):
+        matcher = PathMatcher(["/usr/*", "/opt/lib*", "third*"])
+        self.assertTrue(matcher.match("/usr/include/vector"))
+        self.assertTrue(matcher.match("/usr/"))
+        self.assertFalse(matcher.match("/usr"))
+        self.assertFalse(matcher.match("/usrx/a.h"))
+        self.assertTrue(matcher.match("/opt/libfoo/a.h"))
+        self.assertTrue(matcher.match("/opt/lib"))
+        self.assertFalse(matcher.match("/opt/li"))
+        self.assertTrue(matcher.match("thirdparty/a.h"))
+        self.assertFalse(matcher.match("/thirdparty/a.h"))
+
+    def test_wildcard(self):
+        matcher = PathMatcher(["*/boost/*", "/proj/*/gen/*.h"])
+        self.assertTrue(matcher.match("/usr/include/boost/any.hpp"))
+        self.assertTrue(matcher.match("/proj/module/gen/a.h"))
+        self.assertTrue(matcher.match("/proj/module/gen/a.hpp"))
+        self.assertFalse(matcher.match("/proj/module/src/a.h"))
+
+    def test_metacharacters(self):
+        matcher = PathMatcher(["/proj/a.h", "/proj/c++/*", "/proj/(gen)/*.h"])
+        self.assertTrue(matcher.match("/proj/a.h"))
+        self.assertFalse(matcher.match("/proj/axh"))
+        self.assertTrue(matcher.match("/proj/c++/vector"))
+        self.assertFalse(matcher.match("/proj/cc/vector"))
+        self.assertTrue(matcher.match("/proj/(gen)/a.h"))
+        self.assertFalse(matcher.match("/proj/gen/a.h"))
+        self.assertFalse(matcher.match("/proj/(gen)/axh"))
+
+    def test_memo(self):
+        matcher = PathMatcher(["/usr/*"])
+        self.assertTrue(matcher.match("/usr/a.h"))
+        self.assertFalse(matcher.match("/proj/a.h"))
+        self.assertEqual(matcher._memo, {"/usr/a.h": True, "/proj/a.h": False})  # pylint: disable=W0212
+
+    def test_random(self):
+        rand = random.Random(1)
+        components = ["", "usr", "us", "include", "a.h", "b", "*"]
+        for _ in range(300):
+            patterns_list = []
+            for _ in range(rand.randint(1, 6)):
+                pattern = "/".join(rand.choice(components) for _ in range(rand.randint(1, 4)))
+                patterns_list.append(pattern)
+            matcher = PathMatcher(patterns_list)
+            for _ in range(20):
+                item = "/".join(rand.choice(components[:-1]) for _ in range(rand.randint(1, 5)))
+                self.assertEqual(matcher.match(item), match_reference(patterns_list, item), (patterns_list, item))
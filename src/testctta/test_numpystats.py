@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import random
+import tempfile
+import unittest
+
+from ctta import numpystats
+from ctta.analyzer import analyze
+
+from testctta.test_analyzer import source_event, write_trace
+
+
+@unittest.skipUnless(numpystats.is_available(), "numpy is not installed")
+class AnalyzeStatsTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rand = random.Random(1)
+        self.durations = {}
+        self.files_list = []
+        for file_idx in range(4):
+            events_list = []
+            for idx in range(50):
+                header = f"/proj/./h{rand.randint(0, 9)}.h"
+                if idx % 7 == 0:
+                    header = f"/usr/include/h{idx}"
+                dur = rand.randint(1, 1000)
+                events_list.append(source_event(idx * 1000, dur, header))
+                self.durations.setdefault(header.replace("/./", "/"), []).append(dur)
+            self.files_list.append(write_trace(self.temp_dir.name, f"{file_idx}.json", events_list))
+        self.files_list.append(write_trace(self.temp_dir.name, "empty.json", []))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_analyze(self):
+        np = numpystats.np
+        stats_dict = numpystats.analyze_stats(self.files_list, ["/usr/*"])
+        data_dict = analyze(self.files_list, ["/usr/*"])
+        self.assertEqual(list(stats_dict.keys()), list(data_dict.keys()))
+        for header, stats in stats_dict.items():
+            durations = self.durations[header]
+            self.assertEqual(stats.dur, data_dict[header].dur)
+            self.assertEqual(stats.count, data_dict[header].count)
+            self.assertAlmostEqual(stats.mean, data_dict[header].avg())
+            self.assertAlmostEqual(stats.median, np.median(durations))
+            self.assertAlmostEqual(stats.p95, np.percentile(durations, 95))
+            self.assertEqual(stats.max, max(durations))
+
+    def test_analyze_jobs(self):
+        serial_dict = numpystats.analyze_stats(self.files_list, ["/usr/*"])
+        parallel_dict = numpystats.analyze_stats(self.files_list, ["/usr/*"], jobs=2)
+        self.assertEqual(list(serial_dict.items()), list(parallel_dict.items()))
+
+    def test_empty(self):
+        self.assertEqual(numpystats.analyze_stats(self.files_list[-1:], []), {})
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from ctta import pathintern
+from ctta.pathintern import PathInterner
+from ctta.analyzer import ExcludeItemFilter, merge_data, sort_data, Data
+
+
+class PathInternerTest(unittest.TestCase):
+    def test_get_id(self):
+        interner = PathInterner()
+        path_id = interner.get_id("/proj/./a.h")
+        self.assertEqual(interner.get_id("/proj/a.h"), path_id)
+        self.assertEqual(interner.get_id("/proj/b/../a.h"), path_id)
+        self.assertNotEqual(interner.get_id("/proj/b.h"), path_id)
+        self.assertEqual(interner.get_path(path_id), "/proj/a.h")
+        self.assertEqual(len(interner), 2)
+
+    def test_normalize(self):
+        interner = PathInterner()
+        path = interner.normalize("/proj/./a.h")
+        self.assertEqual(path, "/proj/a.h")
+        self.assertIs(interner.normalize("/proj/a.h"), path)
+
+    def test_memo_limit(self):
+        old_limit = pathintern.MEMO_LIMIT
+        pathintern.MEMO_LIMIT = 2
+        try:
+            interner = PathInterner()
+            ids_list = [interner.get_id(f"/proj/./{idx}.h") for idx in range(5)]
+            self.assertEqual(ids_list, list(range(5)))
+            self.assertLessEqual(len(interner._memo), 2)  # pylint: disable=W0212
+            self.assertEqual(interner.get_id("/proj/0.h"), 0)
+        finally:
+            pathintern.MEMO_LIMIT = old_limit
+
+    def test_merge_ids(self):
+        interner = PathInterner()
+        exclude_filter = ExcludeItemFilter(["/usr/*"])
+        merged_dict = {}
+        merge_data(merged_dict, {"/usr/a.h": Data(10, 1), "/proj/a.h": Data(20, 2)}, exclude_filter, interner)
+        merge_data(merged_dict, {"/proj/a.h": Data(5, 1), "/proj/b.h": Data(1, 1)}, exclude_filter, interner)
+        self.assertEqual(sort_data(merged_dict, interner), {"/proj/b.h": Data(1, 1), "/proj/a.h": Data(25, 3)})
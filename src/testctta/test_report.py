@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import tempfile
+import unittest
+
+from ctta.analyzer import analyze, read_callgrind_packed, read_flame_blocks, get_flame_blocks
+from ctta.callgrind import write_packed_stream
+from ctta.report import generate_reports, SourceSink, FlameSink, CallgrindSink, FlameCollector
+
+from testctta.test_analyzer import source_event, write_trace, clang_trace_events
+
+
+class GenerateReportsTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.files_list = [
+            write_trace(
+                root,
+                "aaa.json",
+                [
+                    {"pid": 1, "tid": 0, "ph": "X", "ts": 0, "dur": 300, "name": "ExecuteCompiler"},
+                    source_event(0, 100, "/usr/include/vector"),
+                    source_event(10, 50, "/proj/a.h"),
+                    source_event(200, 30, "/proj/b.h"),
+                    {"pid": 1, "tid": 0, "ph": "X", "ts": 0, "dur": 130, "name": "Total Source"},
+                ],
+            ),
+            write_trace(root, "bbb.json", [source_event(0, 40, "/proj/b.h"), source_event(50, 20, "/proj/c.h")]),
+            write_trace(root, "ccc.json", []),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def generate(self, jobs=1):
+        root = self.temp_dir.name
+        sinks_list = [
+            SourceSink(["/usr/*"], os.path.join(root, "analyze.txt")),
+            FlameSink(),
+            CallgrindSink(os.path.join(root, "callgrind.txt")),
+        ]
+        results_list = generate_reports(self.files_list, sinks_list, jobs=jobs)
+        return sinks_list, results_list
+
+    def test_reports(self):
+        results_list = self.generate()[1]
+
+        data_dict = results_list[0]
+        self.assertEqual(list(data_dict.items()), list(analyze(self.files_list, ["/usr/*"]).items()))
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir.name, "analyze.txt")))
+
+        svg_list = results_list[1]
+        self.assertEqual(svg_list, [f"{path}.svg" for path in self.files_list[:2]])
+        for svg_path in svg_list:
+            self.assertTrue(os.path.isfile(svg_path))
+
+        callgrind_path = os.path.join(self.temp_dir.name, "callgrind_view.txt")
+        packed_iter = (read_callgrind_packed(file_path) for file_path in self.files_list)
+        write_packed_stream(packed_iter, callgrind_path, view=False)
+        with open(results_list[2], encoding="utf-8") as report_file:
+            with open(callgrind_path, encoding="utf-8") as view_file:
+                self.assertEqual(report_file.read(), view_file.read())
+
+    def test_reports_jobs(self):
+        serial_list = self.generate()[1]
+        parallel_list = self.generate(jobs=2)[1]
+        self.assertEqual(list(serial_list[0].items()), list(parallel_list[0].items()))
+        self.assertEqual(serial_list[1], parallel_list[1])
+
+    def test_flame_collector(self):
+        events_list = clang_trace_events()
+        file_path = write_trace(self.temp_dir.name, "clang.json", events_list)
+        collector = FlameCollector()
+        for event in events_list:
+            collector.add_event(event)
+        blocks = get_flame_blocks(collector.top_store, collector.bottom_store)
+        self.assertEqual(blocks, read_flame_blocks(file_path))
+
+    def test_callgrind_merge(self):
+        root = self.temp_dir.name
+        sink = CallgrindSink(os.path.join(root, "callgrind.txt"), merge=True)
+        report_path = generate_reports(self.files_list, [sink])[0]
+
+        callgrind_path = os.path.join(root, "callgrind_view.txt")
+        packed_iter = (read_callgrind_packed(file_path) for file_path in self.files_list)
+        write_packed_stream(packed_iter, callgrind_path, view=False, merge=True)
+        with open(report_path, encoding="utf-8") as report_file:
+            with open(callgrind_path, encoding="utf-8") as view_file:
+                self.assertEqual(report_file.read(), view_file.read())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import tempfile
+import unittest
+
+from ctta.analyzer import analyze
+from ctta.selftime import analyze_self, read_source_self_data
+
+from testctta.test_analyzer import source_event, write_trace
+
+
+class AnalyzeSelfTest(unittest.TestCase):
+    def setUp(self):
+        ## pylint: disable=R1732
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.files_list = [
+            write_trace(
+                root,
+                "aaa.json",
+                [
+                    source_event(0, 100, "/proj/a.h"),
+                    source_event(10, 40, "/proj/b.h"),
+                    source_event(20, 10, "/usr/include/c"),
+                    source_event(60, 20, "/proj/./d.h"),
+                    {"pid": 1, "tid": 0, "ph": "X", "ts": 0, "dur": 200, "name": "Frontend"},
+                ],
+            ),
+            write_trace(
+                root,
+                "bbb.json",
+                [source_event(0, 50, "/proj/d.h"), source_event(5, 30, "/proj/b.h"), source_event(60, 5, "/proj/b.h")],
+            ),
+            write_trace(root, "ccc.json", []),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read(self):
+        file_dict = read_source_self_data(self.files_list[0])
+        self.assertEqual(file_dict["/proj/a.h"].dur, 100)
+        self.assertEqual(file_dict["/proj/a.h"].self_dur, 40)
+        self.assertEqual(file_dict["/proj/b.h"].self_dur, 30)
+        self.assertEqual(file_dict["/proj/b.h"].parents, {"/proj/a.h": 1})
+        self.assertEqual(file_dict["/usr/include/c"].parents, {"/proj/b.h": 1})
+        self.assertEqual(file_dict["/proj/d.h"].parents, {"/proj/a.h": 1})
+        self.assertEqual(file_dict["/proj/a.h"].parents, {None: 1})
+
+    def test_analyze(self):
+        data_dict = analyze_self(self.files_list, ["/usr/*"])
+        self.assertEqual(list(data_dict.keys()), ["/proj/d.h", "/proj/b.h", "/proj/a.h"])
+
+        b_data = data_dict["/proj/b.h"]
+        self.assertEqual((b_data.dur, b_data.self_dur, b_data.count), (75, 65, 3))
+        ## equal number of includes -- first parent is taken
+        self.assertEqual(b_data.parent, "/proj/a.h")
+        self.assertEqual(b_data.parents, {"/proj/a.h": 1, "/proj/d.h": 1, None: 1})
+
+        d_data = data_dict["/proj/d.h"]
+        self.assertEqual((d_data.dur, d_data.self_dur, d_data.count), (70, 40, 2))
+
+        ## inclusive time is the same as in flat analysis
+        flat_dict = analyze(self.files_list, ["/usr/*"])
+        for header, item_data in data_dict.items():
+            self.assertEqual(item_data.dur, flat_dict[header].dur)
+            self.assertEqual(item_data.count, flat_dict[header].count)
+
+    def test_analyze_jobs(self):
+        serial_dict = analyze_self(self.files_list, ["/usr/*"])
+        parallel_dict = analyze_self(self.files_list, ["/usr/*"], jobs=2)
+        self.assertEqual(list(serial_dict.items()), list(parallel_dict.items()))
+
+    def test_read_threads(self):
+        thread_event = source_event(20, 60, "/proj/e.h")
+        thread_event["tid"] = 1
+        ## event of second thread overlaps events of first thread
+        file_path = write_trace(
+            self.temp_dir.name,
+            "threads.json",
+            [source_event(0, 50, "/proj/a.h"), source_event(10, 30, "/proj/b.h"), thread_event],
+        )
+        file_dict = read_source_self_data(file_path)
+        self.assertEqual(list(file_dict.keys()), ["/proj/a.h", "/proj/b.h", "/proj/e.h"])
+        self.assertEqual(file_dict["/proj/a.h"].self_dur, 20)
+        self.assertEqual(file_dict["/proj/b.h"].parents, {"/proj/a.h": 1})
+        e_data = file_dict["/proj/e.h"]
+        self.assertEqual((e_data.dur, e_data.self_dur, e_data.parents), (60, 60, {None: 1}))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import io
+import json
+import unittest
+
+from ctta.tracereader import EventStreamReader, find_events_list
+
+
+def read_all(content: bytes, chunk_size=4):
+    reader = EventStreamReader(io.BytesIO(content), chunk_size)
+    return list(reader.events())
+
+
+class EventStreamReaderTest(unittest.TestCase):
+    def test_events(self):
+        events_list = [{"ph": "X", "ts": idx, "dur": 10, "name": f"item {idx}"} for idx in range(20)]
+        content = json.dumps({"beginningOfTime": 123, "traceEvents": events_list}, indent=2).encode()
+        self.assertEqual(read_all(content), events_list)
+        self.assertEqual(read_all(content, chunk_size=1024), events_list)
+
+    def test_events_unicode(self):
+        events_list = [{"name": "zażółć gęślą jaźń"}]
+        content = json.dumps({"traceEvents": events_list}, ensure_ascii=False).encode()
+        self.assertEqual(read_all(content, chunk_size=1), events_list)
+
+    def test_no_events(self):
+        self.assertEqual(read_all(b""), [])
+        self.assertEqual(read_all(b"[]"), [])
+        self.assertEqual(read_all(b'{"otherData": {}}'), [])
+        self.assertEqual(read_all(b'{"traceEvents": []}'), [])
+
+    def test_malformed(self):
+        with self.assertRaises(json.decoder.JSONDecodeError):
+            read_all(b'{"traceEvents": [{"ts": 1}, {"ts"')
+        with self.assertRaises(json.decoder.JSONDecodeError):
+            read_all(b'{"traceEvents": [{"ts": 1}')
+        with self.assertRaises(json.decoder.JSONDecodeError):
+            read_all(b'{"otherData": {"traceEvents": [')
+
+    def test_size_limit(self):
+        ## malformed value is not buffered until end of file
+        content = b'{"traceEvents": [{"name": "' + b"a" * 1000 + b'"}]}'
+        reader = EventStreamReader(io.BytesIO(content), 4, max_buffer_size=64)
+        with self.assertRaisesRegex(json.decoder.JSONDecodeError, "size limit"):
+            list(reader.events())
+        reader = EventStreamReader(io.BytesIO(b'{"otherData": "' + b"a" * 1000 + b'"}'), 4, max_buffer_size=64)
+        with self.assertRaisesRegex(json.decoder.JSONDecodeError, "size limit"):
+            list(reader.events())
+
+    def test_key_in_value(self):
+        content = b'{"name": "\\"traceEvents\\": [1]", "otherData": {"traceEvents": [2]}, "traceEvents": [{"ts": 3}]}'
+        self.assertEqual(read_all(content), [{"ts": 3}])
+        self.assertEqual(read_all(b'{"name": "\\"traceEvents\\": [1]"}'), [])
+
+
+class FindEventsListTest(unittest.TestCase):
+    def test_find(self):
+        content = b' {"beginningOfTime": 1, "traceEvents" :\n [{"ts": 1}]}'
+        events_pos = find_events_list(content)
+        self.assertEqual(content[events_pos:], b'{"ts": 1}]}')
+
+        reader = EventStreamReader(io.BytesIO(content[events_pos:]), 4, list_found=True)
+        self.assertEqual(list(reader.events()), [{"ts": 1}])
+
+    def test_not_found(self):
+        self.assertEqual(find_events_list(b""), -1)
+        self.assertEqual(find_events_list(b'[{"traceEvents": []}]'), -1)
+        self.assertEqual(find_events_list(b'{"otherData": {}}'), -1)
+        self.assertEqual(find_events_list(b'{"traceEvents": null}'), -1)
+        self.assertEqual(find_events_list(b'{"name": "\\"traceEvents\\": ["}'), -1)
+        self.assertEqual(find_events_list(b'{"otherData": [{"traceEvents": []}], "ts": 1}'), -1)
+
+    def test_top_level_key(self):
+        content = b'{"name": "\\"traceEvents\\": [1]", "otherData": {"traceEvents": [2]}, "traceEvents": [3]}'
+        events_pos = find_events_list(content)
+        self.assertEqual(content[events_pos:], b"3]}")
+
+    def test_malformed(self):
+        self.assertIsNone(find_events_list(b'{"otherData": {"a', final=False))
+        with self.assertRaises(json.decoder.JSONDecodeError):
+            find_events_list(b'{"otherData": {"a')
+        with self.assertRaises(json.decoder.JSONDecodeError):
+            find_events_list(b'{"otherData" 1, "traceEvents": []}')
@@ -31,6 +31,7 @@ echo "black -- no warnings found"
 ## E126 continuation line over-indented for hanging indent
 ## E201 whitespace after '('
 ## E202 whitespace before ')'
+## E203 whitespace before ':' (black formats slices with complex bounds as "a[x + 1 :]")
 ## E221 multiple spaces before equal operator
 ## E241 multiple spaces after ':'
 ## E262 inline comment should start with '# '
@@ -40,7 +41,7 @@ echo "black -- no warnings found"
 ## E501 line too long (80 > 79 characters)
 ## W391 blank line at end of file
 ## D    all docstyle checks
-ignore_errors=E115,E126,E201,E202,E221,E241,E262,E265,E266,E402,E501,W391,D
+ignore_errors=E115,E126,E201,E202,E203,E221,E241,E262,E265,E266,E402,E501,W391,D
 
 
 echo "running pycodestyle"